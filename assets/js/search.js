@@ -0,0 +1,161 @@
+// Site search over the static index that build_search_index.py writes to
+// assets/search/. Nothing is downloaded until the first search: then the
+// manifest and document list, and one shard per term prefix being typed.
+
+var PandauditSearch = {
+
+  base : (function() {
+    var script = document.currentScript;
+    return script ? new URL("../search/", script.src).href : "/assets/search/";
+  })(),
+  maxResults : 10,
+  manifest : null,
+  docs : null,
+  shards : {},
+
+  init : function() {
+    var input = document.getElementById("nav-search-input");
+    var results = document.getElementById("search-results-container");
+    if (!input || !results) {
+      return;
+    }
+
+    var pending = 0;
+    input.addEventListener("input", function() {
+      var query = input.value;
+      var ticket = ++pending;
+      PandauditSearch.search(query).then(function(hits) {
+        if (ticket === pending) {  // ignore answers to queries typed over since
+          PandauditSearch.render(results, hits, query);
+        }
+      }).catch(function() {
+        results.innerHTML = "<li>Search is unavailable right now.</li>";
+      });
+    });
+  },
+
+  fetchJSON : function(name, version) {
+    return fetch(PandauditSearch.base + name + ".json?v=" + version).then(function(response) {
+      if (!response.ok) {
+        throw new Error(response.status);
+      }
+      return response.json();
+    });
+  },
+
+  load : function() {
+    if (!PandauditSearch.manifest) {
+      PandauditSearch.manifest = PandauditSearch.fetchJSON("manifest", Date.now()).then(function(manifest) {
+        PandauditSearch.docs = PandauditSearch.fetchJSON("docs", manifest.docs);
+        return manifest;
+      }).catch(function(error) {
+        PandauditSearch.manifest = null;  // try again on the next keystroke
+        throw error;
+      });
+    }
+    return PandauditSearch.manifest;
+  },
+
+  shard : function(manifest, prefix) {
+    var version = manifest.shards[prefix];
+    if (!version) {
+      return Promise.resolve({});
+    }
+    if (!PandauditSearch.shards[prefix]) {
+      PandauditSearch.shards[prefix] = PandauditSearch.fetchJSON(encodeURIComponent(prefix), version);
+    }
+    return PandauditSearch.shards[prefix];
+  },
+
+  // Same folding as build_search_index.normalize / tokenize
+  tokens : function(text) {
+    var folded = text.toLowerCase().normalize("NFKD").replace(/[\u0300-\u036f]/g, "");
+    return (folded.match(/[a-z0-9]+/g) || []).filter(function(token) {
+      return token.length >= 2;
+    });
+  },
+
+  search : function(query) {
+    var tokens = PandauditSearch.tokens(query);
+    if (!tokens.length) {
+      return Promise.resolve([]);
+    }
+    return PandauditSearch.load().then(function(manifest) {
+      // Stopwords aren't indexed; the last token may still be a word being typed
+      var stopwords = manifest.stopwords || [];
+      tokens = tokens.filter(function(token, i) {
+        return i === tokens.length - 1 || stopwords.indexOf(token) < 0;
+      });
+      var shards = tokens.map(function(token) {
+        return PandauditSearch.shard(manifest, token.slice(0, manifest.prefix));
+      });
+      return Promise.all([PandauditSearch.docs, Promise.all(shards)]).then(function(loaded) {
+        return PandauditSearch.rank(loaded[0], tokens, loaded[1], manifest.count);
+      });
+    });
+  },
+
+  // Every token must match (as a prefix of some term, so results appear
+  // while typing); documents score the sum of weight x idf of their matches
+  rank : function(docs, tokens, shards, count) {
+    var scores = null;
+    tokens.forEach(function(token, i) {
+      var shard = shards[i];
+      var tokenScores = {};
+      Object.keys(shard).forEach(function(term) {
+        if (term.lastIndexOf(token, 0) !== 0) {
+          return;
+        }
+        var postings = shard[term];
+        var idf = Math.log(1 + count / (postings.length / 2));
+        var exact = term === token ? 1.5 : 1;
+        for (var j = 0; j < postings.length; j += 2) {
+          var doc = postings[j];
+          tokenScores[doc] = (tokenScores[doc] || 0) + postings[j + 1] * idf * exact;
+        }
+      });
+      if (scores === null) {
+        scores = tokenScores;
+      } else {
+        Object.keys(scores).forEach(function(doc) {
+          if (doc in tokenScores) {
+            scores[doc] += tokenScores[doc];
+          } else {
+            delete scores[doc];
+          }
+        });
+      }
+    });
+    return Object.keys(scores || {}).filter(function(doc) {
+      return docs[doc];
+    }).sort(function(a, b) {
+      return scores[b] - scores[a];
+    }).slice(0, PandauditSearch.maxResults).map(function(doc) {
+      return docs[doc];
+    });
+  },
+
+  render : function(container, hits, query) {
+    container.innerHTML = "";
+    if (!hits.length) {
+      if (PandauditSearch.tokens(query).length) {
+        container.innerHTML = "<li>No results found</li>";
+      }
+      return;
+    }
+    hits.forEach(function(hit) {
+      var item = document.createElement("li");
+      var link = document.createElement("a");
+      link.href = hit[1];
+      link.textContent = hit[0];
+      item.appendChild(link);
+      container.appendChild(item);
+    });
+  }
+};
+
+if (document.readyState === "loading") {
+  document.addEventListener("DOMContentLoaded", PandauditSearch.init);
+} else {
+  PandauditSearch.init();
+}
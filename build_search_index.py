@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""Build the site search index as static, prefix-sharded JSON files.
+
+_includes/search.html used to render a JSON list of every post and page
+into every page through Liquid, for the browser to JSON.parse on each
+load, so page weight and build time both grew with the corpus. The index
+is now built here instead, from the front matter and text of posts,
+skills and pages (the same set of sources that check_links.py sees, so
+anything excluded in _config.yml, such as archived_posts while it is
+excluded, is left out).
+
+Output, under assets/search/:
+
+    manifest.json    document count, stopwords and a content hash per file
+    docs.json        [title, url, date, category] per document id
+    <prefix>.json    terms starting with that prefix: {term: [doc, weight, ...]}
+
+assets/js/search.js loads the manifest and docs on the first search and
+then only the shards for the prefixes being typed.
+
+Extracted terms are cached per source file in .search_index_cache.json.
+A run re-reads only changed files and rewrites only the shards that hold
+their old or new terms.
+
+Usage:
+    python3 build_search_index.py            # update changed shards
+    python3 build_search_index.py --full     # rebuild every shard
+    python3 build_search_index.py --report   # also measure search markup on rendered pages
+
+Commit assets/search/ after a run so GitHub Pages serves the index. CI
+rebuilds it and fails when the committed files are out of date.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime
+import hashlib
+import html
+import json
+import math
+from pathlib import Path
+import re
+import sys
+import time
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+import yaml
+
+from check_links import build_url_index, rendered_pages, rendered_templates
+from verify_post_urls import POST_FILE_PATTERN, parse_filename, read_yaml_front_matter
+
+
+OUT_DIR = Path("assets/search")
+CACHE_FILE = ".search_index_cache.json"
+CACHE_VERSION = 1
+PREFIX_LENGTH = 1        # characters per shard key; 2 once shards grow past ~50 KiB
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 30
+# How much a term in each field counts towards a document's weight
+FIELD_WEIGHTS = {"title": 5.0, "category": 3.0, "description": 2.0, "body": 1.0}
+SKIP_TITLES = {"{title}", "404 - Page not found"}
+STOPWORDS = frozenset("""
+    a an and are as at be but by can do for from has have how if in into is it its
+    not of on or our so than that the their then there these they this to was we
+    what when which who will with you your
+""".split())
+
+FRONT_MATTER = re.compile(r"\A---\s*\n.*?\n---\s*\n", re.S)
+LIQUID = re.compile(r"\{%-?\s*(?:raw|endraw)\s*-?%\}|\{%.*?%\}|\{\{.*?\}\}", re.S)
+LINK_TARGET = re.compile(r"\]\([^)]*\)")
+HTML_TAG = re.compile(r"<[^>]+>")
+TERM = re.compile(r"[a-z0-9]+")
+
+
+@dataclass
+class Document:
+    rel_path: str
+    title: str
+    url: str
+    date: str
+    category: str
+    terms: Dict[str, int]
+
+    @property
+    def meta(self) -> List[str]:
+        return [self.title, self.url, self.date, self.category]
+
+
+def normalize(text: str) -> str:
+    """Lowercase ASCII folding, matching search.js."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TERM.findall(normalize(text))
+            if MIN_TERM_LENGTH <= len(t) <= MAX_TERM_LENGTH and t not in STOPWORDS]
+
+
+def plain_text(source: str) -> str:
+    """Body text without front matter, Liquid, HTML tags or link targets."""
+    source = FRONT_MATTER.sub("", source, count=1)
+    source = LIQUID.sub(" ", source)
+    source = LINK_TARGET.sub("]", source)
+    return html.unescape(HTML_TAG.sub(" ", source))
+
+
+def display_date(value) -> str:
+    if isinstance(value, (date, datetime)):
+        return f"{value:%B} {value.day}, {value.year}"
+    return ""
+
+
+def read_document(repo_root: Path, rel_path: str, url: str) -> Optional[Document]:
+    path = repo_root / rel_path
+    front_matter = read_yaml_front_matter(path)
+    if front_matter.get("search") is False:
+        return None
+    body = plain_text(path.read_text(encoding="utf-8"))
+    title = str(front_matter.get("title") or "").strip()
+    if title in SKIP_TITLES:
+        return None
+    if not title:
+        title = next((line.strip() for line in body.splitlines() if line.strip()), path.stem)[:80]
+
+    tags = front_matter.get("tags") or []
+    if isinstance(tags, str):
+        tags = tags.split()
+    if rel_path.startswith("_posts/"):
+        category = ", ".join(map(str, tags))
+        when = display_date(front_matter.get("date") or parse_filename(path)[0])
+    elif rel_path.startswith("_skills/"):
+        category = f"skill: {front_matter.get('category', '')}".rstrip(": ")
+        when = ""
+    else:
+        category = ", ".join(map(str, tags)) or "page"
+        when = display_date(front_matter.get("date"))
+
+    fields = {
+        "title": title,
+        "category": " ".join(map(str, tags)) + " " + str(front_matter.get("category") or ""),
+        "description": " ".join(str(front_matter.get(k) or "") for k in ("subtitle", "description")),
+        "body": body,
+    }
+    weights: Dict[str, float] = defaultdict(float)
+    for field, text in fields.items():
+        for term, count in Counter(tokenize(text)).items():
+            # Sublinear in the count: a term repeated 20 times isn't 20x as relevant
+            weights[term] += FIELD_WEIGHTS[field] * (1 + math.log(count))
+    terms = {term: max(1, round(10 * w)) for term, w in weights.items()}
+    return Document(rel_path, html.unescape(title), url, when, category, terms)
+
+
+def search_sources(repo_root: Path, config: Dict) -> Dict[str, str]:
+    """Source file -> site URL for posts, collection documents and HTML pages."""
+    _, source_urls = build_url_index(repo_root, config)
+    baseurl = "/" + str(config.get("baseurl") or "").strip("/")
+    sources = {}
+    for rel_path, url in source_urls.items():
+        if not rel_path.endswith((".md", ".markdown", ".html")):
+            continue
+        if rel_path.startswith("_posts/") and not POST_FILE_PATTERN.match(rel_path.split("/", 1)[1]):
+            continue
+        sources[rel_path] = (baseurl.rstrip("/") + url) if baseurl != "/" else url
+    return sources
+
+
+def prefix_of(term: str) -> str:
+    return term[:PREFIX_LENGTH]
+
+
+def load_cache(path: Path) -> Dict:
+    if not path.exists():
+        return {}
+    cache = json.loads(path.read_text(encoding="utf-8"))
+    return cache if cache.get("version") == CACHE_VERSION else {}
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    if path.exists() and path.read_bytes() == data:
+        return False
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+    return True
+
+
+def dump(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+def build(repo_root: Path, full: bool) -> Tuple[Dict[str, Dict], List[str], Set[str], float]:
+    """Update the index; returns (cached documents, re-read files, rewritten shards, seconds)."""
+    started = time.perf_counter()
+    config_path = repo_root / "_config.yml"
+    config = yaml.safe_load(config_path.read_text(encoding="utf-8")) or {}
+    out_dir = repo_root / OUT_DIR
+    cache_path = repo_root / CACHE_FILE
+
+    cache = {} if full else load_cache(cache_path)
+    # A config change can move every URL, and a new prefix length moves
+    # every term, so start over
+    config_signature = hashlib.sha256(config_path.read_bytes()).hexdigest()[:16]
+    if (cache.get("config") != config_signature or cache.get("prefix") != PREFIX_LENGTH
+            or not (out_dir / "manifest.json").exists()):
+        cache = {}
+    full = full or not cache
+    cached: Dict[str, Dict] = cache.get("docs", {})
+
+    sources = search_sources(repo_root, config)
+    dirty: Set[str] = set()
+    changed: List[str] = []
+    docs: Dict[str, Dict] = {}
+    for rel_path, url in sorted(sources.items()):
+        st = (repo_root / rel_path).stat()
+        signature = [st.st_mtime_ns, st.st_size]
+        entry = cached.get(rel_path)
+        if entry and entry["signature"] == signature and entry["url"] == url:
+            docs[rel_path] = entry
+            continue
+        changed.append(rel_path)
+        doc = read_document(repo_root, rel_path, url)
+        new_entry = {"signature": signature, "url": url,
+                     "meta": doc.meta if doc else None, "terms": doc.terms if doc else {}}
+        if entry:
+            dirty.update(prefix_of(t) for t in entry["terms"])
+        dirty.update(prefix_of(t) for t in new_entry["terms"])
+        docs[rel_path] = new_entry
+    for rel_path in cached.keys() - docs.keys():
+        changed.append(rel_path)
+        dirty.update(prefix_of(t) for t in cached[rel_path]["terms"])
+
+    # Document ids stay put across runs, so shards without changed terms
+    # remain valid; ids of removed documents are reused
+    ids: Dict[str, int] = {p: i for p, i in cache.get("ids", {}).items()
+                           if p in docs and docs[p]["meta"] is not None}
+    free = sorted(set(range(max(ids.values(), default=-1) + 1)) - set(ids.values()))
+    next_id = max(ids.values(), default=-1) + 1
+    for rel_path in sorted(docs):
+        if docs[rel_path]["meta"] is not None and rel_path not in ids:
+            if free:
+                ids[rel_path] = free.pop(0)
+            else:
+                ids[rel_path] = next_id
+                next_id += 1
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    shard_hashes: Dict[str, str] = {}
+    manifest_path = out_dir / "manifest.json"
+    if not full:
+        shard_hashes = json.loads(manifest_path.read_text(encoding="utf-8")).get("shards", {})
+    else:
+        dirty = {prefix_of(t) for entry in docs.values() for t in entry["terms"]}
+        for stale in out_dir.glob("*.json"):
+            if stale.name not in ("manifest.json", "docs.json") and stale.stem not in dirty:
+                stale.unlink()
+
+    postings: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+    for rel_path, doc_id in sorted(ids.items(), key=lambda item: item[1]):
+        for term, weight in docs[rel_path]["terms"].items():
+            prefix = prefix_of(term)
+            if prefix in dirty:
+                postings[prefix][term] += [doc_id, weight]
+    written: Set[str] = set()
+    for prefix in sorted(dirty):
+        shard = postings.get(prefix)
+        path = out_dir / f"{prefix}.json"
+        if not shard:
+            shard_hashes.pop(prefix, None)
+            if path.exists():
+                path.unlink()
+                written.add(prefix)
+            continue
+        data = dump(shard)
+        shard_hashes[prefix] = hashlib.sha256(data).hexdigest()[:10]
+        if write_if_changed(path, data):
+            written.add(prefix)
+
+    table: List[Optional[List[str]]] = [None] * (max(ids.values(), default=-1) + 1)
+    for rel_path, doc_id in ids.items():
+        table[doc_id] = docs[rel_path]["meta"]
+    docs_data = dump(table)
+    write_if_changed(out_dir / "docs.json", docs_data)
+    write_if_changed(manifest_path, dump({
+        "count": len(ids),
+        "docs": hashlib.sha256(docs_data).hexdigest()[:10],
+        "prefix": PREFIX_LENGTH,
+        "shards": shard_hashes,
+        "stopwords": sorted(STOPWORDS),
+    }))
+
+    tmp = cache_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": CACHE_VERSION, "config": config_signature,
+                               "prefix": PREFIX_LENGTH, "ids": ids, "docs": docs}), encoding="utf-8")
+    tmp.replace(cache_path)
+    return docs, changed, written, time.perf_counter() - started
+
+
+LEGACY_SCRIPT = """ <script src="https://unpkg.com/simple-jekyll-search@latest/dest/simple-jekyll-search.min.js"></script>
+ <script>
+ var searchjson = '[ \\
+ ]';
+ searchjson = JSON.parse(searchjson);
+
+ var sjs = SimpleJekyllSearch({
+ searchInput: document.getElementById('nav-search-input'),
+ resultsContainer: document.getElementById('search-results-container'),
+ json: searchjson
+ });
+ </script>
+"""
+
+
+SEARCH_BLOCK = re.compile(r"\{%-?\s*if\s+site\.post_search\s*-?%\}(.*?)\{%-?\s*endif\s*-?%\}", re.S)
+NEW_SCRIPT = """ <script src="/assets/js/search.js" defer></script>\n"""
+
+
+def legacy_inline_bytes(docs: Dict[str, Dict]) -> int:
+    """Approximate size of the JSON the old search.html rendered into each
+    page: one entry per post and per HTML page, as its Liquid loop wrote them."""
+    entry = (' {{ \\\n "title" : "{title}", \\\n "category" : "{category}", \\\n'
+             ' "url" : "{url}", \\\n "date" : "{date}" \\\n }}, \\\n')
+    total = len(LEGACY_SCRIPT)
+    for rel_path, doc in docs.items():
+        if doc["meta"] is None or rel_path.startswith("_skills/"):
+            continue  # skills weren't in the old index
+        title, url, when, category = doc["meta"]
+        total += len(entry.format(title=html.escape(title), category=category, url=url,
+                                  date=when or "January 1, 1970").encode("utf-8"))
+    return total
+
+
+def search_markup_bytes(path: Path) -> int:
+    """Bytes a template adds to a page for search: its
+    {% if site.post_search %} blocks, Liquid tags and comments removed."""
+    text = path.read_text(encoding="utf-8", errors="ignore")
+    text = re.sub(r"\{%\s*comment\s*%\}.*?\{%\s*endcomment\s*%\}", "", text, flags=re.S)
+    return sum(len(LIQUID.sub("", block).encode("utf-8")) for block in SEARCH_BLOCK.findall(text))
+
+
+def report(repo_root: Path, docs: Dict[str, Dict], elapsed: float) -> None:
+    out_dir = repo_root / OUT_DIR
+    shards = [p for p in out_dir.glob("*.json") if p.name not in ("manifest.json", "docs.json")]
+    sizes = sorted(p.stat().st_size for p in shards)
+    docs_bytes = (out_dir / "docs.json").stat().st_size + (out_dir / "manifest.json").stat().st_size
+    print(f"\nIndex: {len(shards)} shards, {sum(sizes) / 1024:.1f} KiB total "
+          f"(median {sizes[len(sizes) // 2] / 1024:.1f} KiB, largest {sizes[-1] / 1024:.1f} KiB), "
+          f"docs + manifest {docs_bytes / 1024:.1f} KiB")
+
+    # Measured on the pages Jekyll renders, through their layouts and includes
+    config = yaml.safe_load((repo_root / "_config.yml").read_text(encoding="utf-8")) or {}
+    _, source_urls = build_url_index(repo_root, config)
+    per_page = {url: sum(search_markup_bytes(t) for t in rendered_templates(repo_root, rel_path, config))
+                for url, rel_path in rendered_pages(repo_root, source_urls).items()}
+    searchable = [url for url, size in per_page.items() if size]
+    print(f"Pages with search: {len(searchable)} of {len(per_page)} rendered pages"
+          + (f" (without: {', '.join(u for u in per_page if u not in searchable)})"
+             if len(searchable) < len(per_page) else ""))
+    if searchable:
+        markup = max(per_page[url] for url in searchable)
+        # The old include rendered the same overlay, plus the whole index inline
+        inline = markup - len(NEW_SCRIPT) + legacy_inline_bytes(docs)
+        print(f"Per page, search markup: {markup:,} bytes (link, overlay and script tag); "
+              f"the old inline index would be {inline:,} bytes. The index is fetched once, "
+              f"on the first search")
+    print(f"Liquid work per build: the old include rendered one index entry per document "
+          f"on every page; this one renders none (index built here in {elapsed:.2f}s)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--full", action="store_true", help="ignore the cache and rebuild every shard")
+    parser.add_argument("--report", action="store_true", help="compare page weight with the inline index")
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).resolve().parent
+    docs, changed, written, elapsed = build(repo_root, args.full)
+    indexed = sum(1 for d in docs.values() if d["meta"] is not None)
+    terms = len({t for d in docs.values() for t in d["terms"]})
+    print(f"{indexed} documents, {terms} terms; {len(changed)} file(s) re-read, "
+          f"{len(written)} shard(s) rewritten in {elapsed:.2f}s")
+    if args.report:
+        report(repo_root, docs, elapsed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""Check that internal links in posts, skills and pages resolve.
+
+Builds the set of every URL the site will produce, straight from the
+source tree and _config.yml (no Jekyll build, no network): posts via the
+configured permalink, skills via the collection permalink, pages, and
+static files such as assets. Links are then pulled from every markdown and
+HTML file and each one is a single set lookup.
+
+Extracted links are cached per file in .link_check_cache.json, so only
+files that changed since the last run are read again. Every run still
+checks all links against the fresh URL set, because deleting or renaming a
+post breaks links in files that did not change.
+
+Archived posts aren't built, so their broken links are listed separately
+as warnings and don't fail the run unless --strict is given.
+
+Usage:
+    python3 check_links.py           # report broken links, exit 1 if any in built files
+    python3 check_links.py --full    # ignore the cache and re-read everything
+    python3 check_links.py --strict  # archived posts' broken links fail the run too
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from fnmatch import fnmatch
+import json
+import os
+from pathlib import Path
+import re
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import unquote, urljoin, urlsplit
+
+import yaml
+
+from verify_post_urls import (
+    POST_FILE_PATTERN,
+    expected_url_for_post,
+    read_yaml_front_matter,
+    slugify,
+)
+
+
+CACHE_FILE = ".link_check_cache.json"
+CACHE_VERSION = 1
+SCAN_DIRS = ("_posts", "_skills", "archived_posts", "_layouts", "_includes")
+WARN_ONLY_DIRS = ("archived_posts/",)   # scanned, but not part of the built site
+SCAN_SUFFIXES = (".md", ".markdown", ".html")
+# Files that may carry front matter and so become pages rather than static files
+TEXT_SUFFIXES = (".md", ".markdown", ".html", ".htm", ".xml", ".txt", ".css",
+                 ".scss", ".sass", ".js", ".json")
+JEKYLL_DEFAULT_EXCLUDES = ("Gemfile", "Gemfile.lock", "node_modules", "vendor")
+PLUGIN_URLS = {"jekyll-sitemap": "/sitemap.xml"}
+PARALLEL_THRESHOLD = 32
+
+MARKDOWN_LINK = re.compile(r"\]\(\s*<?(\{\{.*?\}\}[^)\s>]*|[^)\s>]+)")
+REFERENCE_LINK = re.compile(r"^\s{0,3}\[[^\]]+\]:\s*<?(\S+?)>?(?:\s|$)")
+HTML_LINK = re.compile(r"""\b(?:href|src)\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.I)
+LIQUID_URL = re.compile(r"""^\{\{\s*(['"])(.*?)\1\s*\|\s*(?:relative_url|absolute_url)\s*\}\}(.*)$""")
+LIQUID_BASEURL = re.compile(r"^\{\{\s*site\.baseurl\s*\}\}(.*)$")
+LIQUID_BLOCK = re.compile(r"\{%-?\s*(raw|comment)\s*-?%\}")
+INCLUDE = re.compile(r"\{%-?\s*include\s+([\w./-]+\.html)")
+SCHEME = re.compile(r"^[a-z][a-z0-9+.-]*:", re.I)
+
+
+@dataclass
+class BrokenLink:
+    source: str
+    line: int
+    target: str
+    resolved: str
+
+
+def is_excluded(rel_path: str, excludes: Iterable[str]) -> bool:
+    for pattern in excludes:
+        pattern = pattern.rstrip("/")
+        if rel_path == pattern or rel_path.startswith(pattern + "/") or fnmatch(rel_path, pattern):
+            return True
+    return False
+
+
+def has_front_matter(path: Path) -> bool:
+    with path.open("rb") as f:
+        return f.read(3) == b"---"
+
+
+def page_url(rel_path: str, front_matter: Dict) -> str:
+    """Output URL of a page (a non-collection file with front matter)."""
+    if front_matter.get("permalink"):
+        return "/" + str(front_matter["permalink"]).lstrip("/")
+    stem, suffix = os.path.splitext(rel_path)
+    if suffix in (".md", ".markdown"):
+        suffix = ".html"
+    elif suffix in (".scss", ".sass"):
+        suffix = ".css"
+    url = "/" + stem + suffix
+    return url[: -len("index.html")] if url.endswith("/index.html") else url
+
+
+def url_path(url: str) -> str:
+    return urlsplit(url).path or "/"
+
+
+def build_url_index(repo_root: Path, config: Dict) -> Tuple[Set[str], Dict[str, str]]:
+    """Every URL path the site will produce, plus the URL of each source file."""
+    excludes = list(config.get("exclude") or []) + list(JEKYLL_DEFAULT_EXCLUDES)
+    urls: Set[str] = set()
+    source_urls: Dict[str, str] = {}
+
+    def add(rel_path: Optional[str], url: str) -> None:
+        urls.add(url)
+        if rel_path:
+            source_urls[rel_path] = url
+
+    for post in (repo_root / "_posts").glob("*"):
+        if POST_FILE_PATTERN.match(post.name) and read_yaml_front_matter(post).get("published") is not False:
+            add(f"_posts/{post.name}", url_path(expected_url_for_post(post, config)))
+
+    for name, settings in (config.get("collections") or {}).items():
+        settings = settings or {}
+        if not settings.get("output"):
+            continue
+        template = settings.get("permalink", f"/{name}/:path/")
+        for doc in (repo_root / f"_{name}").glob("*"):
+            if doc.suffix not in SCAN_SUFFIXES or read_yaml_front_matter(doc).get("published") is False:
+                continue
+            url = template.replace(":name", slugify(doc.stem)).replace(":path", doc.stem)
+            url = url.replace(":collection", name).replace(":output_ext", ".html")
+            add(f"_{name}/{doc.name}", url)
+
+    # Pages and static files: everything outside _ and . directories that
+    # isn't excluded
+    for dirpath, dirnames, filenames in os.walk(repo_root):
+        rel_dir = os.path.relpath(dirpath, repo_root).replace(os.sep, "/")
+        rel_dir = "" if rel_dir == "." else rel_dir + "/"
+        dirnames[:] = [d for d in dirnames if d[0] not in "._#"
+                       and not is_excluded(rel_dir + d, excludes)]
+        for filename in filenames:
+            rel_path = rel_dir + filename
+            if filename[0] in "._#" or filename.endswith("~") or is_excluded(rel_path, excludes):
+                continue
+            path = Path(dirpath) / filename
+            if path.suffix.lower() in TEXT_SUFFIXES and has_front_matter(path):
+                front_matter = read_yaml_front_matter(path)
+                if front_matter.get("published") is not False:
+                    add(rel_path, page_url(rel_path, front_matter))
+            else:
+                add(rel_path, "/" + rel_path)
+
+    for plugin, url in PLUGIN_URLS.items():
+        if plugin in (config.get("plugins") or []):
+            add(None, url)
+    return urls, source_urls
+
+
+def source_type(rel_path: str) -> str:
+    """Jekyll's document type for front matter defaults: posts, a collection, or pages."""
+    if rel_path.startswith("_posts/"):
+        return "posts"
+    if rel_path.startswith("_") and "/" in rel_path:
+        return rel_path.split("/", 1)[0][1:]
+    return "pages"
+
+
+def layout_for(rel_path: str, front_matter: Dict, config: Dict) -> Optional[str]:
+    """Layout Jekyll renders a source with: its own `layout:`, else the most
+    specific `defaults` entry in _config.yml whose scope covers it."""
+    if "layout" in front_matter:
+        return front_matter["layout"] or None
+    kind = source_type(rel_path)
+    layout, best = None, (-1, False)
+    for entry in config.get("defaults") or []:
+        scope, values = entry.get("scope") or {}, entry.get("values") or {}
+        path = str(scope.get("path") or "").strip("/")
+        if "layout" not in values or scope.get("type", kind) != kind:
+            continue
+        if path and rel_path != path and not rel_path.startswith(path + "/"):
+            continue
+        rank = (len(path), "type" in scope)
+        if rank >= best:   # later entries win ties, as in Jekyll
+            layout, best = values["layout"], rank
+    return layout or None
+
+
+def rendered_templates(repo_root: Path, rel_path: str, config: Dict) -> List[Path]:
+    """The source plus every layout and include Jekyll renders it with:
+    layouts up their `layout:` chain, includes transitively. Includes named
+    by a Liquid variable can't be resolved statically and are skipped."""
+    seen: List[Path] = []
+
+    def visit(path: Path) -> None:
+        if path in seen or not path.is_file():
+            return
+        seen.append(path)
+        for name in INCLUDE.findall(path.read_text(encoding="utf-8", errors="ignore")):
+            visit(repo_root / "_includes" / name)
+
+    source = repo_root / rel_path
+    visit(source)
+    layout = layout_for(rel_path, read_yaml_front_matter(source), config)
+    while layout:
+        path = repo_root / "_layouts" / f"{layout}.html"
+        if path in seen or not path.is_file():
+            break
+        visit(path)
+        layout = read_yaml_front_matter(path).get("layout")
+    return seen
+
+
+def rendered_pages(repo_root: Path, source_urls: Dict[str, str]) -> Dict[str, str]:
+    """URL -> source of every page Jekyll renders to HTML through a layout:
+    posts, collection documents and markdown/HTML pages with front matter."""
+    return {url: rel_path for rel_path, url in sorted(source_urls.items())
+            if Path(rel_path).suffix in SCAN_SUFFIXES and has_front_matter(repo_root / rel_path)}
+
+
+def resolves(path: str, urls: Set[str]) -> bool:
+    """Whether a URL path is served, allowing for the forms a static host
+    accepts: with or without the trailing slash, and without '.html'."""
+    if path in urls:
+        return True
+    if path.endswith("/"):
+        return path.rstrip("/") + ".html" in urls or (path + "index.html") in urls
+    return path + "/" in urls or path + ".html" in urls
+
+
+def extract_links(path: str) -> List[Tuple[int, str]]:
+    """(line, raw target) for every link in a file, outside code blocks.
+
+    Streams the file line by line; fenced code, {% raw %} and {% comment %}
+    blocks are skipped since their contents are examples, not links.
+    """
+    links: List[Tuple[int, str]] = []
+    fence: Optional[str] = None
+    skip_until: Optional[str] = None
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for lineno, line in enumerate(f, 1):
+            stripped = line.lstrip()
+            if fence:
+                if stripped.startswith(fence):
+                    fence = None
+                continue
+            if stripped.startswith(("```", "~~~")):
+                fence = stripped[:3]
+                continue
+            if not skip_until:
+                match = LIQUID_BLOCK.search(line)
+                if match:
+                    skip_until = "end" + match.group(1)
+            if skip_until:
+                if re.search(r"\{%-?\s*" + skip_until + r"\s*-?%\}", line):
+                    skip_until = None
+                continue
+            line = re.sub(r"`[^`]*`", "", line)  # inline code
+            for match in MARKDOWN_LINK.finditer(line):
+                links.append((lineno, match.group(1)))
+            match = REFERENCE_LINK.match(line)
+            if match:
+                links.append((lineno, match.group(1)))
+            for match in HTML_LINK.finditer(line):
+                links.append((lineno, match.group(1) if match.group(1) is not None else match.group(2)))
+    return links
+
+
+def resolve_target(target: str, base_url: str, site_url: str) -> Optional[str]:
+    """Site-relative URL path a link points to, or None if it isn't a
+    checkable internal link (external, anchor-only, or built by Liquid)."""
+    target = target.strip()
+    match = LIQUID_URL.match(target)
+    if match:
+        target = "/" + match.group(2).lstrip("/") + match.group(3)
+    else:
+        match = LIQUID_BASEURL.match(target)
+        if match:
+            target = "/" + match.group(1).lstrip("/")
+    if "{{" in target or "{%" in target:
+        return None
+    if site_url and target.startswith(site_url):
+        target = target[len(site_url):] or "/"
+    if not target or target.startswith("#") or target.startswith("//") or SCHEME.match(target):
+        return None
+    path = urlsplit(urljoin(base_url, target)).path
+    return unquote(path) if path else None
+
+
+def load_cache(path: Path) -> Dict:
+    if not path.exists():
+        return {}
+    cache = json.loads(path.read_text(encoding="utf-8"))
+    return cache.get("files", {}) if cache.get("version") == CACHE_VERSION else {}
+
+
+def save_cache(path: Path, files: Dict) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps({"version": CACHE_VERSION, "files": files}), encoding="utf-8")
+    tmp.replace(path)
+
+
+def scan_files(repo_root: Path, source_urls: Dict[str, str]) -> List[str]:
+    """Markdown and HTML sources: pages, collections, layouts, includes and
+    archived posts (which aren't built, but whose links should still work)."""
+    files = {rel for rel in source_urls if rel.endswith(SCAN_SUFFIXES)}
+    for directory in SCAN_DIRS:
+        for path in (repo_root / directory).glob("*"):
+            if path.suffix in SCAN_SUFFIXES:
+                files.add(f"{directory}/{path.name}")
+    return sorted(files)
+
+
+def collect_links(repo_root: Path, files: List[str], cache: Dict,
+                  full: bool) -> Tuple[Dict, List[str]]:
+    """Links per file, re-reading only files whose size or mtime changed."""
+    fresh: Dict = {}
+    changed: List[str] = []
+    for rel in files:
+        st = (repo_root / rel).stat()
+        signature = [st.st_mtime_ns, st.st_size]
+        entry = cache.get(rel)
+        if not full and entry and entry["signature"] == signature:
+            fresh[rel] = entry
+        else:
+            fresh[rel] = {"signature": signature, "links": None}
+            changed.append(rel)
+
+    paths = [str(repo_root / rel) for rel in changed]
+    if len(paths) > PARALLEL_THRESHOLD:
+        with ProcessPoolExecutor() as pool:
+            extracted = list(pool.map(extract_links, paths, chunksize=8))
+    else:
+        extracted = [extract_links(p) for p in paths]
+    for rel, links in zip(changed, extracted):
+        fresh[rel]["links"] = links
+    return fresh, changed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--full", action="store_true", help="ignore the cache and re-read every file")
+    parser.add_argument("--cache", default=CACHE_FILE, help="per-file link cache")
+    parser.add_argument("--strict", action="store_true",
+                        help="fail on broken links in archived posts as well")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    repo_root = Path(__file__).resolve().parent
+    config = yaml.safe_load((repo_root / "_config.yml").read_text(encoding="utf-8")) or {}
+    site_url = str(config.get("url", "")).rstrip("/")
+    baseurl = "/" + str(config.get("baseurl") or "").strip("/")
+
+    urls, source_urls = build_url_index(repo_root, config)
+    files = scan_files(repo_root, source_urls)
+    cache_path = repo_root / args.cache
+    entries, changed = collect_links(repo_root, files, load_cache(cache_path), args.full)
+    save_cache(cache_path, entries)
+
+    broken: List[BrokenLink] = []
+    checked = 0
+    for rel in files:
+        base = source_urls.get(rel, "/")
+        for line, target in entries[rel]["links"]:
+            path = resolve_target(target, base, site_url)
+            if path is None:
+                continue
+            if baseurl != "/" and path.startswith(baseurl):
+                path = path[len(baseurl):] or "/"
+            checked += 1
+            if not resolves(path, urls):
+                broken.append(BrokenLink(rel, line, target, path))
+
+    elapsed = time.perf_counter() - started
+    print(f"{len(urls)} site URLs, {len(files)} files ({len(changed)} re-read), "
+          f"{checked} internal links checked in {elapsed:.2f}s")
+
+    def show(title: str, links: List[BrokenLink]) -> None:
+        print(f"\n{len(links)} {title}:")
+        for b in links:
+            shown = b.target if b.target == b.resolved else f"{b.target} -> {b.resolved}"
+            print(f"{b.source}:{b.line}: {shown}")
+
+    warnings = [b for b in broken if b.source.startswith(WARN_ONLY_DIRS)]
+    errors = [b for b in broken if not b.source.startswith(WARN_ONLY_DIRS)]
+    if args.strict:
+        errors, warnings = broken, []
+    if warnings:
+        show("broken link(s) in archived posts (warnings: not built)", warnings)
+    if errors:
+        show("broken internal link(s)", errors)
+        return 1
+    print("No broken internal links." if not warnings else "\nNo broken links in built files.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
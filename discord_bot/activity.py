@@ -0,0 +1,176 @@
+"""Rolling message counts behind !activity.
+
+Counts are kept in fixed-size ring arrays at three resolutions (minute,
+hour and day buckets), one row per channel, per member and per server.
+Every slot is stamped with the bucket it currently holds, so old slots are
+recycled in place and a stale slot is simply ignored on read. Recording a
+message is a few array increments; answering "how many in the last 6h" or
+"who posted most this week" sums a handful of columns, without touching
+message history.
+
+Memory is fixed up front: once a table is full, a new key takes over the
+row of the least recently active one.
+"""
+from array import array
+from collections import OrderedDict
+import math
+import re
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+# name -> (seconds per bucket, buckets kept)
+RESOLUTIONS = {
+    'minute': (60, 60),
+    'hour': (3600, 48),
+    'day': (86400, 30),
+}
+WINDOW_UNITS = {'m': 60, 'h': 3600, 'd': 86400}
+SPARK = '▁▂▃▄▅▆▇█'
+
+
+def parse_window(text: str) -> Optional[int]:
+    """'30m', '6h', '7d' -> seconds; None if malformed or longer than kept."""
+    match = re.fullmatch(r'(\d+)\s*([mhd])', text.strip().lower())
+    if not match:
+        return None
+    seconds = int(match.group(1)) * WINDOW_UNITS[match.group(2)]
+    longest = max(size * n for size, n in RESOLUTIONS.values())
+    return seconds if 0 < seconds <= longest else None
+
+
+def resolution_for(seconds: int) -> str:
+    """Finest resolution whose ring covers the window."""
+    for name, (size, n) in RESOLUTIONS.items():
+        if seconds <= size * n:
+            return name
+    return 'day'
+
+
+class RollingCounts:
+    """Time-bucketed ring arrays for up to `capacity` keys."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.rows: "OrderedDict[Hashable, int]" = OrderedDict()  # least recently active first
+        self.keys: List[Optional[Hashable]] = [None] * capacity
+        # Counts live in plain arrays (cheap single-item increments on the hot
+        # path) with numpy views over the same memory for the reads
+        self.flat = {name: array('i', bytes(4 * capacity * n)) for name, (_, n) in RESOLUTIONS.items()}
+        self.counts = {name: np.frombuffer(self.flat[name], dtype=np.int32).reshape(capacity, n)
+                       for name, (_, n) in RESOLUTIONS.items()}
+        # Which bucket each column currently holds (-1: never used)
+        self.stamps = {name: np.full(n, -1, dtype=np.int64) for name, (_, n) in RESOLUTIONS.items()}
+        self.current = {name: -1 for name in RESOLUTIONS}
+        self._rings = [(name, size, n, self.flat[name]) for name, (size, n) in RESOLUTIONS.items()]
+
+    def _new_row(self, key: Hashable) -> int:
+        if len(self.rows) < self.capacity:
+            row = len(self.rows)
+        else:
+            # Full: take over the row of the key that has been quiet longest
+            _, row = self.rows.popitem(last=False)
+            for counts in self.counts.values():
+                counts[row] = 0
+        self.rows[key] = row
+        self.keys[row] = key
+        return row
+
+    def record(self, key: Hashable, now: float):
+        row = self.rows.get(key)
+        if row is None:
+            row = self._new_row(key)
+        else:
+            self.rows.move_to_end(key)
+        for name, size, n, flat in self._rings:
+            bucket = int(now // size)
+            slot = bucket % n
+            if bucket != self.current[name]:
+                if bucket < self.current[name]:
+                    # Late message: count it only if its bucket is still held
+                    if self.stamps[name][slot] == bucket:
+                        flat[row * n + slot] += 1
+                    continue
+                # First message in a new bucket: recycle the column for everyone
+                self.current[name] = bucket
+                self.stamps[name][slot] = bucket
+                self.counts[name][:, slot] = 0
+            flat[row * n + slot] += 1
+
+    def _columns(self, seconds: int, now: float) -> Tuple[str, np.ndarray]:
+        name = resolution_for(seconds)
+        size, n = RESOLUTIONS[name]
+        current = int(now // size)
+        buckets = np.arange(current - min(n, math.ceil(seconds / size)) + 1, current + 1)
+        slots = buckets % n
+        return name, slots[self.stamps[name][slots] == buckets]
+
+    def total(self, key: Hashable, seconds: int, now: float) -> int:
+        row = self.rows.get(key)
+        if row is None:
+            return 0
+        name, slots = self._columns(seconds, now)
+        return int(self.counts[name][row, slots].sum())
+
+    def top(self, seconds: int, now: float, limit: int = 5,
+            keys: Optional[List[Hashable]] = None) -> List[Tuple[Hashable, int]]:
+        """Most active keys over the window (optionally among `keys` only)."""
+        name, slots = self._columns(seconds, now)
+        if keys is None:
+            rows = np.arange(len(self.rows))
+        else:
+            rows = np.array([self.rows[k] for k in keys if k in self.rows], dtype=np.intp)
+        if not len(rows) or not len(slots):
+            return []
+        sums = self.counts[name][np.ix_(rows, slots)].sum(axis=1)
+        order = np.argsort(-sums, kind='stable')[:limit]
+        return [(self.keys[rows[i]], int(sums[i])) for i in order if sums[i] > 0]
+
+    def series(self, key: Hashable, seconds: int, now: float) -> Tuple[str, List[int]]:
+        """Per-bucket counts over the window, oldest first."""
+        name = resolution_for(seconds)
+        size, n = RESOLUTIONS[name]
+        current = int(now // size)
+        buckets = np.arange(current - min(n, math.ceil(seconds / size)) + 1, current + 1)
+        slots = buckets % n
+        row = self.rows.get(key)
+        if row is None:
+            return name, [0] * len(buckets)
+        values = np.where(self.stamps[name][slots] == buckets, self.counts[name][row, slots], 0)
+        return name, values.tolist()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.counts.values())
+
+
+class ActivityTracker:
+    """Rolling counts per server, per channel and per (server, member)."""
+
+    def __init__(self, max_channels: int = 500, max_members: int = 5000, max_guilds: int = 8):
+        self.guilds = RollingCounts(max_guilds)
+        self.channels = RollingCounts(max_channels)
+        self.members = RollingCounts(max_members)
+        self.channel_guild: Dict[int, int] = {}
+
+    def record(self, guild_id: int, channel_id: int, author_id: int, now: float):
+        self.guilds.record(guild_id, now)
+        self.channels.record(channel_id, now)
+        self.members.record((guild_id, author_id), now)
+        self.channel_guild[channel_id] = guild_id
+        if len(self.channel_guild) > 2 * self.channels.capacity:
+            self.channel_guild = {c: g for c, g in self.channel_guild.items() if c in self.channels.rows}
+
+    def guild_channels(self, guild_id: int) -> List[int]:
+        return [c for c, g in self.channel_guild.items() if g == guild_id and c in self.channels.rows]
+
+    @property
+    def nbytes(self) -> int:
+        return self.guilds.nbytes + self.channels.nbytes + self.members.nbytes
+
+
+def sparkline(values: List[int]) -> str:
+    peak = max(values) if values else 0
+    if not peak:
+        return SPARK[0] * len(values)
+    return ''.join(SPARK[min(len(SPARK) - 1, v * len(SPARK) // (peak + 1))] for v in values)
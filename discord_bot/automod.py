@@ -0,0 +1,219 @@
+"""Spam and flood detection for the on_message hot path.
+
+Each member gets a small fixed-size state: a ring of their last few
+message times and content hashes, plus running mention and link totals.
+A check is a handful of array reads and one hash of the normalised
+text, so it stays in the low microseconds and never awaits:
+
+- flood: `rate` messages within the rate window (the `rate`-th one trips it)
+- duplicate: the same content (case, spacing and punctuation ignored)
+  posted `duplicates` times within the duplicate window; short replies
+  such as "ok" or "thanks!" are never counted as duplicates
+- mentions / links: too many mentions or links summed over their window
+
+The bot turns a violation into the usual warn / mute / kick escalation.
+Run this file for a benchmark at 10k messages per second.
+"""
+from array import array
+from collections import deque
+from dataclasses import dataclass
+import string
+from typing import Deque, Dict, Optional, Tuple
+
+RING = 8                 # messages remembered per member
+HASHED_CHARS = 512       # only the start of long messages is hashed
+MIN_DUPLICATE_CHARS = 10  # shorter normalised text ("lol", "thanks") is never a duplicate
+PRUNE_EVERY = 10_000     # checks between sweeps of idle members
+_IGNORED = string.whitespace + string.punctuation
+_NORMALIZE = str.maketrans('', '', _IGNORED)
+_EMPTY_TIMES = array('d', [float('-inf')] * RING)
+_EMPTY_HASHES = array('q', [0] * RING)
+
+
+@dataclass(frozen=True)
+class Violation:
+    kind: str      # 'flood', 'duplicate', 'mentions', 'links' or 'cooldown'
+    detail: str
+    severe: bool   # severe violations mute as well as warn
+
+
+class _MemberState:
+    __slots__ = ('times', 'hashes', 'pos', 'last', 'mentions', 'mention_total',
+                 'links', 'link_total', 'quiet_until')
+
+    def __init__(self):
+        self.times = _EMPTY_TIMES[:]
+        self.hashes = _EMPTY_HASHES[:]
+        self.pos = 0
+        self.last = 0.0
+        # Created on first mention / link; most members never need them
+        self.mentions: Optional[Deque[Tuple[float, int]]] = None
+        self.mention_total = 0
+        self.links: Optional[Deque[Tuple[float, int]]] = None
+        self.link_total = 0
+        self.quiet_until = 0.0
+
+
+def _windowed(entries: Deque[Tuple[float, int]], total: int, now: float, window: float,
+              count: int) -> int:
+    """Add `count` to a (time, count) window and return the new total.
+
+    Entries leave from the left as they age out, so this is amortised O(1)."""
+    while entries and now - entries[0][0] > window:
+        total -= entries.popleft()[1]
+    if count:
+        entries.append((now, count))
+        total += count
+    return total
+
+
+class AutoMod:
+    """Per-member sliding-window counters; `check` is called for every message."""
+
+    def __init__(self, rate: Tuple[int, float] = (6, 5.0),
+                 duplicates: Tuple[int, float] = (3, 30.0),
+                 mentions: Tuple[int, float] = (8, 10.0),
+                 links: Tuple[int, float] = (5, 10.0),
+                 cooldown: float = 30.0):
+        if rate[0] > RING or duplicates[0] > RING:
+            raise ValueError(f'rate and duplicate limits must be at most {RING}')
+        self.rate, self.rate_window = rate
+        self.duplicates, self.duplicate_window = duplicates
+        self.mention_limit, self.mention_window = mentions
+        self.link_limit, self.link_window = links
+        self.cooldown = cooldown
+        self.members: Dict[int, _MemberState] = {}
+        self._checks = 0
+
+    def check(self, user_id: int, content: str, mentions: int, now: float) -> Optional[Violation]:
+        """Record one message and return a violation, if it is one.
+
+        While a member is cooling down after a violation, further
+        violations are returned with kind 'cooldown' so the bot can delete
+        the message without warning again.
+        """
+        self._checks += 1
+        if self._checks % PRUNE_EVERY == 0:
+            self._prune(now)
+
+        state = self.members.get(user_id)
+        if state is None:
+            state = self.members[user_id] = _MemberState()
+        state.last = now
+
+        pos = state.pos
+        times = state.times
+        # The slot being overwritten holds the message `RING` back; the one
+        # `rate - 1` back is the oldest of the last `rate` messages
+        oldest_in_rate = times[(pos - self.rate + 1) % RING] if self.rate > 1 else now
+        times[pos] = now
+        text = content[:HASHED_CHARS].lower().translate(_NORMALIZE)
+        # 0 marks "don't compare": short replies repeat in normal conversation
+        h = hash(text) if len(text) >= MIN_DUPLICATE_CHARS else 0
+        state.hashes[pos] = h
+        state.pos = (pos + 1) % RING
+
+        violation = None
+        if now - oldest_in_rate <= self.rate_window:
+            violation = Violation('flood', f'{self.rate} messages in {self.rate_window:g}s', True)
+        elif h and state.hashes.count(h) >= self.duplicates:
+            horizon = now - self.duplicate_window
+            repeats = sum(1 for i in range(RING) if state.hashes[i] == h and times[i] >= horizon)
+            if repeats >= self.duplicates:
+                violation = Violation('duplicate', f'same message {repeats} times', False)
+
+        if mentions or state.mentions:
+            if state.mentions is None:
+                state.mentions = deque()
+            state.mention_total = _windowed(state.mentions, state.mention_total, now,
+                                            self.mention_window, mentions)
+            if violation is None and state.mention_total >= self.mention_limit:
+                violation = Violation('mentions', f'{state.mention_total} mentions in '
+                                                  f'{self.mention_window:g}s', True)
+        links = content.count('://')
+        if links or state.links:
+            if state.links is None:
+                state.links = deque()
+            state.link_total = _windowed(state.links, state.link_total, now, self.link_window, links)
+            if violation is None and state.link_total >= self.link_limit:
+                violation = Violation('links', f'{state.link_total} links in {self.link_window:g}s', False)
+
+        if violation is None:
+            return None
+        if now < state.quiet_until:
+            return Violation('cooldown', violation.detail, False)
+        state.quiet_until = now + self.cooldown
+        return violation
+
+    def forget(self, user_id: int):
+        self.members.pop(user_id, None)
+
+    def _prune(self, now: float):
+        """Drop members idle longer than every window (bounded memory)."""
+        horizon = now - max(self.rate_window, self.duplicate_window, self.mention_window,
+                            self.link_window, self.cooldown)
+        self.members = {uid: s for uid, s in self.members.items() if s.last >= horizon}
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def _benchmark(rate: int = 10_000, seconds: float = 3.0):
+    """Replay `rate` msgs/s through an event loop that also answers commands,
+    with and without automod, and compare command latency."""
+    import asyncio
+    import random
+    import statistics
+    import time
+
+    rng = random.Random(7)
+    normal = ['anyone know how to unpivot this export?', 'thanks, that fixed it',
+              'the totals tie now', 'see https://pandaudit.com/skills/', 'lol', '!ping']
+    stream = []
+    for i in range(int(rate * seconds)):
+        r = rng.random()
+        if r < 0.02:   # spam bursts from a few accounts
+            stream.append((rng.randrange(5), 'BUY CHEAP GOLD 4 U!!!', 0))
+        elif r < 0.025:
+            stream.append((rng.randrange(5, 10), 'hey <@1> <@2> <@3>', 3))
+        else:
+            stream.append((rng.randrange(10, 200_000), rng.choice(normal), 0))
+
+    async def replay(automod: Optional[AutoMod]):
+        latencies, violations = [], 0
+        check_ns = 0
+        start = time.perf_counter()
+        batch = max(1, rate // 1000)  # deliver in 1ms batches
+        for n in range(0, len(stream), batch):
+            due = start + n / rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            for user, content, mentions in stream[n:n + batch]:
+                arrived = time.perf_counter()
+                if automod is not None:
+                    t0 = time.perf_counter_ns()
+                    if automod.check(user, content, mentions, arrived):
+                        violations += 1
+                    check_ns += time.perf_counter_ns() - t0
+                if content.startswith('!'):
+                    latencies.append(time.perf_counter() - max(arrived, due))
+        elapsed = time.perf_counter() - start
+        return latencies, violations, check_ns, elapsed
+
+    print(f'{rate:,} msgs/s for {seconds:g}s ({len(stream):,} messages)')
+    for label, automod in (('without automod', None), ('with automod', AutoMod())):
+        latencies, violations, check_ns, elapsed = asyncio.run(replay(automod))
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)] * 1e3
+        line = (f'  {label:<16} wall {elapsed:.2f}s  command latency '
+                f'p50 {statistics.median(latencies) * 1e3:.2f}ms p99 {p99:.2f}ms')
+        if automod is not None:
+            line += (f'  check {check_ns / len(stream) / 1e3:.2f}us/msg '
+                     f'({check_ns / 1e9 / elapsed:.1%} of a core), {violations:,} violations')
+        print(line)
+
+
+if __name__ == '__main__':
+    _benchmark()
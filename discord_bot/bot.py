@@ -7,15 +7,27 @@ general commands, and community engagement features.
 """
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import os
 import sys
 import logging
 import asyncio
+from functools import partial
 from datetime import datetime, timedelta
+import io
 import json
+import time
 from typing import Optional
 
+import config
+from activity import ActivityTracker, parse_window, sparkline
+from automod import AutoMod
+from feed import FeedPoller
+from outbound import OutboundScheduler, Priority
+from profiling import MODES as PROFILE_MODES, Profiler, cache_report, format_cache_report, task_dump
+from skills_index import SkillIndex
+from welcome import WelcomeBatcher
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -46,6 +58,43 @@ warnings = {}
 # Store muted users (in production, use a database)
 muted_users = {}
 
+# Every API call goes through this queue, so cosmetic traffic can't starve
+# moderation of rate-limit budget
+outbound = OutboundScheduler(
+    config.OUTBOUND_ROUTE_BUDGETS,
+    global_budget=config.OUTBOUND_GLOBAL_BUDGET,
+    saturation_depth=config.OUTBOUND_SATURATION_DEPTH,
+)
+
+
+def reply(ctx, *args, **kwargs):
+    """Answer a command through the outbound queue; resolves to the sent message."""
+    return outbound.submit(Priority.REPLY, f'channel:{ctx.channel.id}', partial(ctx.send, *args, **kwargs))
+
+# Recent blog posts from pandaudit.com/feed.xml (see poll_feed)
+feed_poller = FeedPoller(config.FEED_URL, cache_size=config.FEED_CACHE_SIZE)
+
+# Rolling per-channel / per-member message counts behind !activity
+activity = ActivityTracker(max_channels=config.ACTIVITY_MAX_CHANNELS,
+                           max_members=config.ACTIVITY_MAX_MEMBERS)
+activity_since = datetime.utcnow()
+
+# Per-member flood / duplicate / mention / link counters (see on_message)
+automod = AutoMod(
+    rate=config.AUTOMOD_RATE,
+    duplicates=config.AUTOMOD_DUPLICATES,
+    mentions=config.AUTOMOD_MENTIONS,
+    links=config.AUTOMOD_LINKS,
+    cooldown=config.AUTOMOD_COOLDOWN_SECONDS,
+)
+automod_tasks = set()  # running enforcements (holds a reference until done)
+
+# Trigram index over _skills/*.md (rebuilt when the files change)
+skill_index = SkillIndex(config.SKILLS_DIR)
+
+# !profile sessions (no hooks are installed until one starts)
+profiler = Profiler()
+
 
 # ============================================================================
 # EVENT HANDLERS
@@ -64,47 +113,87 @@ async def on_ready():
             name="pandaudit.com | !help"
         )
     )
+
+    # on_ready fires again after reconnects; only start the poller once
+    if config.FEED_POLL_SECONDS > 0 and not poll_feed.is_running():
+        poll_feed.start()
+
     logger.info('Bot is ready!')
 
 
-@bot.event
-async def on_member_join(member):
-    """Welcome new members."""
-    logger.info(f'New member joined: {member.name}')
-    
-    # Find general or welcome channel
-    welcome_channels = ['welcome', 'general', 'introductions']
-    channel = None
-    
-    for channel_name in welcome_channels:
-        channel = discord.utils.get(member.guild.text_channels, name=channel_name)
-        if channel:
-            break
-    
-    if channel:
+def welcome_embed(members, raid=False):
+    """One welcome for a batch of new members (see welcome.WelcomeBatcher)."""
+    if raid:
+        # Raid-sized batches: no mentions, just a short note
         embed = discord.Embed(
-            title=f"Welcome to PANDAUDIT Community! 👋",
-            description=f"Hey {member.mention}, welcome to our community of data analytics enthusiasts!",
+            title="Welcome, new members! 👋",
+            description=f"{len(members)} people just joined. Welcome to our community of "
+                        f"data analytics enthusiasts!",
             color=discord.Color.blue()
         )
-        embed.add_field(
-            name="🚀 Get Started",
-            value="• Check out our latest posts at [pandaudit.com](https://pandaudit.com)\n"
-                  "• Ask questions in the help channels\n"
-                  "• Share your automation wins in #showcase",
-            inline=False
-        )
-        embed.add_field(
-            name="💡 Quick Commands",
-            value="• `!help` - See all commands\n"
-                  "• `!latest` - Get the latest blog post\n"
-                  "• `!about` - Learn about PANDAUDIT",
-            inline=False
+    else:
+        mentions = ', '.join(m.mention for m in members[:config.WELCOME_MAX_MENTIONS])
+        if len(members) > config.WELCOME_MAX_MENTIONS:
+            mentions += f" and {len(members) - config.WELCOME_MAX_MENTIONS} more"
+        embed = discord.Embed(
+            title=f"Welcome to PANDAUDIT Community! 👋",
+            description=f"Hey {mentions}, welcome to our community of data analytics enthusiasts!",
+            color=discord.Color.blue()
         )
+    embed.add_field(
+        name="🚀 Get Started",
+        value="• Check out our latest posts at [pandaudit.com](https://pandaudit.com)\n"
+              "• Ask questions in the help channels\n"
+              "• Share your automation wins in #showcase",
+        inline=False
+    )
+    embed.add_field(
+        name="💡 Quick Commands",
+        value="• `!help` - See all commands\n"
+              "• `!latest` - Get the latest blog post\n"
+              "• `!about` - Learn about PANDAUDIT",
+        inline=False
+    )
+    if len(members) == 1:
+        member = members[0]
         embed.set_thumbnail(url=member.avatar.url if member.avatar else member.default_avatar.url)
-        embed.set_footer(text="Happy learning! 🎉")
-        
-        await channel.send(embed=embed)
+    embed.set_footer(text="Happy learning! 🎉")
+    return embed
+
+
+welcome_batcher = WelcomeBatcher(
+    welcome_embed,
+    config.WELCOME_CHANNELS,
+    batch_seconds=config.WELCOME_BATCH_SECONDS,
+    max_batch_seconds=config.WELCOME_MAX_BATCH_SECONDS,
+    raid_joins=config.RAID_JOIN_THRESHOLD,
+    raid_window=config.RAID_WINDOW_SECONDS,
+    send=lambda channel, embed: outbound.submit(
+        Priority.NOTIFY, f'channel:{channel.id}', partial(channel.send, embed=embed)),
+)
+
+
+@bot.event
+async def on_member_join(member):
+    """Welcome new members (batched, so join bursts don't flood the channel)."""
+    logger.info(f'New member joined: {member.name}')
+    welcome_batcher.add(member)
+
+
+@bot.event
+async def on_guild_channel_create(channel):
+    welcome_batcher.forget(channel.guild.id)
+
+
+@bot.event
+async def on_guild_channel_delete(channel):
+    welcome_batcher.forget(channel.guild.id)
+
+
+@bot.event
+async def on_guild_channel_update(before, after):
+    if before.name != after.name:
+        welcome_batcher.forget(after.guild.id)
 
 
 @bot.event
@@ -113,16 +202,28 @@ async def on_message(message):
     # Ignore bot messages
     if message.author.bot:
         return
+
+    if message.guild:
+        now = time.time()
+        activity.record(message.guild.id, message.channel.id, message.author.id, now)
+
+        # AutoMod: the check is synchronous and cheap; enforcement runs as
+        # its own task so this handler never waits on the API
+        author = message.author
+        if (config.AUTOMOD_ENABLED and isinstance(author, discord.Member)
+                and not author.guild_permissions.manage_messages):
+            violation = automod.check(author.id, message.content,
+                                      len(message.raw_mentions) + len(message.raw_role_mentions), now)
+            if violation:
+                task = asyncio.create_task(enforce_automod(message, violation))
+                automod_tasks.add(task)
+                task.add_done_callback(automod_tasks.discard)
+                return
     
-    # Auto-react to messages in blog-updates channel
+    # Auto-react to messages in blog-updates channel (cosmetic: dropped if
+    # the outbound queue is saturated)
     if message.channel.name == 'blog-updates':
-        try:
-            await message.add_reaction('👍')
-            await message.add_reaction('💬')
-            await message.add_reaction('🔖')
-            logger.info(f'Added reactions to message in {message.channel.name}')
-        except Exception as e:
-            logger.error(f'Failed to add reactions: {e}')
+        add_reactions(message)
     
     # Process commands
     await bot.process_commands(message)
@@ -132,16 +233,205 @@ async def on_message(message):
 async def on_command_error(ctx, error):
     """Handle command errors."""
     if isinstance(error, commands.MissingPermissions):
-        await ctx.send("❌ You don't have permission to use this command.")
+        await reply(ctx, "❌ You don't have permission to use this command.")
     elif isinstance(error, commands.MissingRequiredArgument):
-        await ctx.send(f"❌ Missing required argument: {error.param.name}\nUse `!help {ctx.command}` for usage.")
+        await reply(ctx, f"❌ Missing required argument: {error.param.name}\nUse `!help {ctx.command}` for usage.")
     elif isinstance(error, commands.CommandNotFound):
-        await ctx.send("❌ Command not found. Use `!help` to see available commands.")
+        await reply(ctx, "❌ Command not found. Use `!help` to see available commands.")
     elif isinstance(error, commands.BadArgument):
-        await ctx.send(f"❌ Invalid argument provided. Use `!help {ctx.command}` for usage.")
+        await reply(ctx, f"❌ Invalid argument provided. Use `!help {ctx.command}` for usage.")
     else:
         logger.error(f'Command error: {error}')
-        await ctx.send("❌ An error occurred while processing the command.")
+        await reply(ctx, "❌ An error occurred while processing the command.")
+
+
+# ============================================================================
+# BACKGROUND TASKS
+# ============================================================================
+
+def feed_entry_embed(entry):
+    """Embed for one blog post from the feed."""
+    description = entry.description
+    if len(description) > 300:
+        description = description[:300].rstrip() + '…'
+    embed = discord.Embed(
+        title=f"📰 {entry.title}",
+        description=description,
+        color=discord.Color.green(),
+        url=entry.link
+    )
+    embed.set_footer(text="💬 Share your thoughts after reading!")
+    return embed
+
+
+def add_reactions(message):
+    """Queue the auto-react emojis on a message without waiting for them."""
+    for emoji in config.AUTO_REACT_EMOJIS:
+        outbound.post(Priority.COSMETIC, f'reactions:{message.channel.id}',
+                      partial(message.add_reaction, emoji), key=('react', message.id, emoji))
+
+
+@tasks.loop(seconds=max(config.FEED_POLL_SECONDS, 1))
+async def poll_feed():
+    """Post new feed items to #blog-updates (an unchanged feed is a 304)."""
+    try:
+        new_entries = await feed_poller.poll()
+    except Exception as e:
+        logger.warning(f'Feed poll failed: {e}')
+        return
+
+    for entry in new_entries:
+        logger.info(f'New blog post in feed: {entry.title}')
+        embed = feed_entry_embed(entry)
+
+        for guild in bot.guilds:
+            channel = discord.utils.get(guild.text_channels, name=config.CHANNEL_NAMES['blog_updates'])
+            if not channel:
+                continue
+            try:
+                msg = await outbound.submit(Priority.NOTIFY, f'channel:{channel.id}',
+                                            partial(channel.send, embed=embed))
+                if msg:
+                    add_reactions(msg)
+            except Exception as e:
+                logger.error(f'Failed to post feed entry to {guild.name}: {e}')
+
+
+@poll_feed.after_loop
+async def close_feed_session():
+    await feed_poller.close()
+
+
+# ============================================================================
+# MODERATION HELPERS
+# ============================================================================
+# Shared by the moderation commands and AutoMod
+
+def parse_duration(duration: str) -> Optional[int]:
+    """'10s', '10m', '1h', '1d' -> seconds; None if malformed."""
+    time_units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    unit = duration[-1:]
+    if unit not in time_units or not duration[:-1].isdigit():
+        return None
+    return int(duration[:-1]) * time_units[unit]
+
+
+async def apply_mute(member, seconds, reason):
+    """Give the member the Muted role (creating it if needed) and return it."""
+    guild = member.guild
+    muted_role = discord.utils.get(guild.roles, name="Muted")
+    if not muted_role:
+        muted_role = await outbound.submit(
+            Priority.MODERATION, f'members:{guild.id}',
+            partial(guild.create_role, name="Muted", reason="Auto-created muted role"))
+        
+        # Set permissions for all channels (one route per channel, so these go out in parallel)
+        await asyncio.gather(*(
+            outbound.submit(Priority.MODERATION, f'channel:{channel.id}',
+                            partial(channel.set_permissions, muted_role, send_messages=False, speak=False))
+            for channel in guild.channels
+        ))
+    
+    await outbound.submit(Priority.MODERATION, f'members:{guild.id}',
+                          partial(member.add_roles, muted_role, reason=reason))
+    
+    # Store mute info
+    muted_users[member.id] = {
+        'unmute_time': datetime.utcnow() + timedelta(seconds=seconds),
+        'role': muted_role,
+        'guild_id': guild.id
+    }
+    return muted_role
+
+
+async def expire_mute(member, muted_role, seconds, channel):
+    """Wait out the mute, then lift it unless someone already did."""
+    await asyncio.sleep(seconds)
+    if member.id in muted_users:
+        await outbound.submit(Priority.MODERATION, f'members:{member.guild.id}',
+                              partial(member.remove_roles, muted_role, reason="Mute duration expired"))
+        del muted_users[member.id]
+        await outbound.submit(Priority.NOTIFY, f'channel:{channel.id}', partial(
+            channel.send, f"🔊 {member.mention} has been automatically unmuted."))
+        logger.info(f'{member.name} was automatically unmuted')
+
+
+def record_warning(member, reason, moderator):
+    """Store a warning and return the member's warning count."""
+    warnings.setdefault(member.id, []).append({
+        'reason': reason,
+        'moderator': moderator,
+        'timestamp': datetime.utcnow().isoformat()
+    })
+    return len(warnings[member.id])
+
+
+async def dm_warning(member, reason, warning_count):
+    """DM the member about a warning; False if it couldn't be delivered."""
+    dm_embed = discord.Embed(
+        title="⚠️ You've been warned",
+        description=f"You received a warning in {member.guild.name}",
+        color=discord.Color.yellow()
+    )
+    dm_embed.add_field(name="Reason", value=reason, inline=False)
+    dm_embed.add_field(name="Total Warnings", value=f"{warning_count}", inline=True)
+    dm_embed.set_footer(text="Please follow the server rules to avoid further action.")
+    try:
+        await outbound.submit(Priority.NOTIFY, 'dm', partial(member.send, embed=dm_embed))
+        return True
+    except Exception:
+        return False
+
+
+async def escalate_warnings(member, warning_count):
+    """Kick the member once they reach MAX_WARNINGS_BEFORE_KICK; True if kicked."""
+    if warning_count < config.MAX_WARNINGS_BEFORE_KICK:
+        return False
+    reason = f"Reached {warning_count} warnings"
+    await outbound.submit(Priority.MODERATION, f'members:{member.guild.id}',
+                          partial(member.kick, reason=reason))
+    logger.info(f'{member.name} was kicked. Reason: {reason}')
+    return True
+
+
+async def enforce_automod(message, violation):
+    """Delete the offending message, then warn / mute / kick as for a manual warning.
+
+    While the member is cooling down from a recent violation the message is
+    only deleted, so one burst of spam costs one warning.
+    """
+    member = message.author
+    try:
+        await outbound.submit(Priority.MODERATION, f'channel:{message.channel.id}', message.delete)
+    except discord.NotFound:
+        pass
+    except Exception as e:
+        logger.error(f'AutoMod could not delete a message from {member.name}: {e}')
+    if violation.kind == 'cooldown':
+        return
+    
+    reason = f"AutoMod: {violation.kind} ({violation.detail})"
+    try:
+        warning_count = record_warning(member, reason, "AutoMod")
+        logger.info(f'{member.name} was warned by AutoMod. Reason: {reason}')
+        if await escalate_warnings(member, warning_count):
+            await outbound.submit(Priority.NOTIFY, f'channel:{message.channel.id}', partial(
+                message.channel.send, f"👢 {member.mention} was removed by AutoMod ({violation.kind})."))
+            return
+        
+        notice = f"⚠️ {member.mention}, slow down ({violation.kind}). Warning {warning_count}/{config.MAX_WARNINGS_BEFORE_KICK}."
+        muted_role = None
+        if violation.severe:
+            seconds = parse_duration(config.DEFAULT_MUTE_DURATION)
+            muted_role = await apply_mute(member, seconds, reason)
+            notice += f" Muted for {config.DEFAULT_MUTE_DURATION}."
+        await outbound.submit(Priority.NOTIFY, f'channel:{message.channel.id}',
+                              partial(message.channel.send, notice))
+        await dm_warning(member, reason, warning_count)
+        if muted_role is not None:
+            await expire_mute(member, muted_role, seconds, message.channel)
+    except Exception as e:
+        logger.error(f'AutoMod action against {member.name} failed: {e}')
 
 
 # ============================================================================
@@ -153,7 +443,8 @@ async def on_command_error(ctx, error):
 async def kick(ctx, member: discord.Member, *, reason: Optional[str] = "No reason provided"):
     """Kick a user from the server."""
     try:
-        await member.kick(reason=reason)
+        await outbound.submit(Priority.MODERATION, f'members:{ctx.guild.id}',
+                              partial(member.kick, reason=reason))
         
         embed = discord.Embed(
             title="👢 Member Kicked",
@@ -164,10 +455,10 @@ async def kick(ctx, member: discord.Member, *, reason: Optional[str] = "No reaso
         embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
         embed.timestamp = datetime.utcnow()
         
-        await ctx.send(embed=embed)
+        await reply(ctx, embed=embed)
         logger.info(f'{member.name} was kicked by {ctx.author.name}. Reason: {reason}')
     except Exception as e:
-        await ctx.send(f"❌ Failed to kick member: {e}")
+        await reply(ctx, f"❌ Failed to kick member: {e}")
         logger.error(f'Failed to kick {member.name}: {e}')
 
 
@@ -176,7 +467,8 @@ async def kick(ctx, member: discord.Member, *, reason: Optional[str] = "No reaso
 async def ban(ctx, member: discord.Member, *, reason: Optional[str] = "No reason provided"):
     """Ban a user from the server."""
     try:
-        await member.ban(reason=reason, delete_message_days=1)
+        await outbound.submit(Priority.MODERATION, f'members:{ctx.guild.id}',
+                              partial(member.ban, reason=reason, delete_message_days=1))
         
         embed = discord.Embed(
             title="🔨 Member Banned",
@@ -187,10 +479,10 @@ async def ban(ctx, member: discord.Member, *, reason: Optional[str] = "No reason
         embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
         embed.timestamp = datetime.utcnow()
         
-        await ctx.send(embed=embed)
+        await reply(ctx, embed=embed)
         logger.info(f'{member.name} was banned by {ctx.author.name}. Reason: {reason}')
     except Exception as e:
-        await ctx.send(f"❌ Failed to ban member: {e}")
+        await reply(ctx, f"❌ Failed to ban member: {e}")
         logger.error(f'Failed to ban {member.name}: {e}')
 
 
@@ -199,36 +491,12 @@ async def ban(ctx, member: discord.Member, *, reason: Optional[str] = "No reason
 async def mute(ctx, member: discord.Member, duration: Optional[str] = "10m", *, reason: Optional[str] = "No reason provided"):
     """Mute a user for a specified duration (e.g., 10m, 1h, 1d)."""
     try:
-        # Parse duration
-        time_units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
-        unit = duration[-1]
-        
-        if unit not in time_units:
-            await ctx.send("❌ Invalid duration format. Use: 10s, 10m, 1h, or 1d")
+        seconds = parse_duration(duration)
+        if seconds is None:
+            await reply(ctx, "❌ Invalid duration format. Use: 10s, 10m, 1h, or 1d")
             return
         
-        amount = int(duration[:-1])
-        seconds = amount * time_units[unit]
-        
-        # Create muted role if it doesn't exist
-        muted_role = discord.utils.get(ctx.guild.roles, name="Muted")
-        if not muted_role:
-            muted_role = await ctx.guild.create_role(name="Muted", reason="Auto-created muted role")
-            
-            # Set permissions for all channels
-            for channel in ctx.guild.channels:
-                await channel.set_permissions(muted_role, send_messages=False, speak=False)
-        
-        # Add muted role
-        await member.add_roles(muted_role, reason=reason)
-        
-        # Store mute info
-        unmute_time = datetime.utcnow() + timedelta(seconds=seconds)
-        muted_users[member.id] = {
-            'unmute_time': unmute_time,
-            'role': muted_role,
-            'guild_id': ctx.guild.id
-        }
+        muted_role = await apply_mute(member, seconds, reason)
         
         embed = discord.Embed(
             title="🔇 Member Muted",
@@ -240,21 +508,13 @@ async def mute(ctx, member: discord.Member, duration: Optional[str] = "10m", *,
         embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
         embed.timestamp = datetime.utcnow()
         
-        await ctx.send(embed=embed)
+        await reply(ctx, embed=embed)
         logger.info(f'{member.name} was muted by {ctx.author.name} for {duration}. Reason: {reason}')
         
-        # Schedule unmute
-        await asyncio.sleep(seconds)
-        if member.id in muted_users:
-            await member.remove_roles(muted_role, reason="Mute duration expired")
-            del muted_users[member.id]
-            await ctx.send(f"🔊 {member.mention} has been automatically unmuted.")
-            logger.info(f'{member.name} was automatically unmuted')
-    
-    except ValueError:
-        await ctx.send("❌ Invalid duration format. Use: 10s, 10m, 1h, or 1d")
+        await expire_mute(member, muted_role, seconds, ctx.channel)
+    
     except Exception as e:
-        await ctx.send(f"❌ Failed to mute member: {e}")
+        await reply(ctx, f"❌ Failed to mute member: {e}")
         logger.error(f'Failed to mute {member.name}: {e}')
 
 
@@ -265,7 +525,8 @@ async def unmute(ctx, member: discord.Member):
     try:
         muted_role = discord.utils.get(ctx.guild.roles, name="Muted")
         if muted_role in member.roles:
-            await member.remove_roles(muted_role, reason=f"Unmuted by {ctx.author.name}")
+            await outbound.submit(Priority.MODERATION, f'members:{ctx.guild.id}',
+                                  partial(member.remove_roles, muted_role, reason=f"Unmuted by {ctx.author.name}"))
             
             if member.id in muted_users:
                 del muted_users[member.id]
@@ -278,12 +539,12 @@ async def unmute(ctx, member: discord.Member):
             embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
             embed.timestamp = datetime.utcnow()
             
-            await ctx.send(embed=embed)
+            await reply(ctx, embed=embed)
             logger.info(f'{member.name} was unmuted by {ctx.author.name}')
         else:
-            await ctx.send(f"❌ {member.mention} is not muted.")
+            await reply(ctx, f"❌ {member.mention} is not muted.")
     except Exception as e:
-        await ctx.send(f"❌ Failed to unmute member: {e}")
+        await reply(ctx, f"❌ Failed to unmute member: {e}")
         logger.error(f'Failed to unmute {member.name}: {e}')
 
 
@@ -293,18 +554,20 @@ async def clear(ctx, amount: Optional[int] = 10):
     """Delete a specified number of messages from the channel."""
     try:
         if amount < 1 or amount > 100:
-            await ctx.send("❌ Please specify a number between 1 and 100.")
+            await reply(ctx, "❌ Please specify a number between 1 and 100.")
             return
         
-        deleted = await ctx.channel.purge(limit=amount + 1)  # +1 to include the command message
+        deleted = await outbound.submit(  # +1 to include the command message
+            Priority.MODERATION, f'channel:{ctx.channel.id}', partial(ctx.channel.purge, limit=amount + 1))
         
-        msg = await ctx.send(f"🗑️ Deleted {len(deleted) - 1} message(s).")
-        await asyncio.sleep(3)
-        await msg.delete()
+        msg = await reply(ctx, f"🗑️ Deleted {len(deleted) - 1} message(s).")
+        # Tidy up the notice after 3s; the handler doesn't wait for it
+        if msg:
+            outbound.post(Priority.COSMETIC, f'channel:{ctx.channel.id}', msg.delete, delay=3)
         
         logger.info(f'{ctx.author.name} deleted {len(deleted) - 1} messages in {ctx.channel.name}')
     except Exception as e:
-        await ctx.send(f"❌ Failed to delete messages: {e}")
+        await reply(ctx, f"❌ Failed to delete messages: {e}")
         logger.error(f'Failed to delete messages: {e}')
 
 
@@ -313,17 +576,7 @@ async def clear(ctx, amount: Optional[int] = 10):
 async def warn(ctx, member: discord.Member, *, reason: Optional[str] = "No reason provided"):
     """Issue a warning to a user."""
     try:
-        if member.id not in warnings:
-            warnings[member.id] = []
-        
-        warning_data = {
-            'reason': reason,
-            'moderator': ctx.author.name,
-            'timestamp': datetime.utcnow().isoformat()
-        }
-        warnings[member.id].append(warning_data)
-        
-        warning_count = len(warnings[member.id])
+        warning_count = record_warning(member, reason, ctx.author.name)
         
         embed = discord.Embed(
             title="⚠️ Warning Issued",
@@ -335,26 +588,17 @@ async def warn(ctx, member: discord.Member, *, reason: Optional[str] = "No reaso
         embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
         embed.timestamp = datetime.utcnow()
         
-        await ctx.send(embed=embed)
+        await reply(ctx, embed=embed)
         
-        # DM the user
-        try:
-            dm_embed = discord.Embed(
-                title="⚠️ You've been warned",
-                description=f"You received a warning in {ctx.guild.name}",
-                color=discord.Color.yellow()
-            )
-            dm_embed.add_field(name="Reason", value=reason, inline=False)
-            dm_embed.add_field(name="Total Warnings", value=f"{warning_count}", inline=True)
-            dm_embed.set_footer(text="Please follow the server rules to avoid further action.")
-            
-            await member.send(embed=dm_embed)
-        except:
-            await ctx.send("⚠️ Could not send DM to user.")
+        if not await dm_warning(member, reason, warning_count):
+            await reply(ctx, "⚠️ Could not send DM to user.")
         
         logger.info(f'{member.name} was warned by {ctx.author.name}. Reason: {reason}')
+        
+        if await escalate_warnings(member, warning_count):
+            await reply(ctx, f"👢 {member.mention} reached {warning_count} warnings and has been kicked.")
     except Exception as e:
-        await ctx.send(f"❌ Failed to warn member: {e}")
+        await reply(ctx, f"❌ Failed to warn member: {e}")
         logger.error(f'Failed to warn {member.name}: {e}')
 
 
@@ -363,7 +607,7 @@ async def warn(ctx, member: discord.Member, *, reason: Optional[str] = "No reaso
 async def view_warnings(ctx, member: discord.Member):
     """View all warnings for a user."""
     if member.id not in warnings or not warnings[member.id]:
-        await ctx.send(f"✅ {member.mention} has no warnings.")
+        await reply(ctx, f"✅ {member.mention} has no warnings.")
         return
     
     embed = discord.Embed(
@@ -379,7 +623,7 @@ async def view_warnings(ctx, member: discord.Member):
             inline=False
         )
     
-    await ctx.send(embed=embed)
+    await reply(ctx, embed=embed)
 
 
 # ============================================================================
@@ -423,15 +667,30 @@ async def about(ctx):
     embed.set_thumbnail(url="https://pandaudit.com/assets/img/avatar-icon.png")
     embed.set_footer(text="Join our community of data-driven finance professionals!")
     
-    await ctx.send(embed=embed)
+    await reply(ctx, embed=embed)
 
 
 @bot.command(name='latest', help='Get the latest blog post')
 async def latest(ctx):
     """Fetch and display the latest blog post from pandaudit.com."""
-    # In a real implementation, you'd scrape the website or use an API
-    # For now, we'll provide a generic response with a link
-    
+    # Served from the feed poller's cache. Without the polling loop, refresh
+    # it here instead (a conditional GET: usually a 304)
+    if not poll_feed.is_running():
+        try:
+            await feed_poller.poll()
+        except Exception as e:
+            logger.warning(f'Feed fetch failed: {e}')
+    entry = feed_poller.latest
+    if entry:
+        embed = feed_entry_embed(entry)
+        embed.add_field(
+            name="🔗 More Posts",
+            value="[pandaudit.com/blog](https://pandaudit.com/blog)",
+            inline=False
+        )
+        await reply(ctx, embed=embed)
+        return
+
     embed = discord.Embed(
         title="📰 Latest from PANDAUDIT",
         description="Check out our latest insights on data analytics and automation!",
@@ -453,7 +712,35 @@ async def latest(ctx):
     
     embed.set_footer(text="💬 Share your thoughts after reading!")
     
-    await ctx.send(embed=embed)
+    await reply(ctx, embed=embed)
+
+
+@bot.command(name='skill', help='Find a skill in the pandaudit.com skills library')
+async def skill(ctx, *, query: str):
+    """Look up a skill by name, title, description or category (typos are fine)."""
+    matches = skill_index.search(query)
+    if not matches:
+        await reply(ctx, f"❌ No skill matches `{query}`. Browse the library: {config.WEBSITE_URL}/skills/")
+        return
+
+    best, _ = matches[0]
+    url = config.SKILL_URL.format(name=best.name)
+    embed = discord.Embed(
+        title=f"🧰 {best.title}",
+        description=best.description,
+        color=discord.Color.blue(),
+        url=url
+    )
+    if best.inputs:
+        inputs = "\n".join(f"• {item}" for item in best.inputs[:4])
+        embed.add_field(name="📥 Inputs", value=inputs[:1024], inline=False)
+    embed.add_field(name="🔗 Open the skill", value=url, inline=False)
+    if len(matches) > 1:
+        others = ", ".join(f"`{other.name}`" for other, _ in matches[1:])
+        embed.add_field(name="🔎 Also close", value=others, inline=False)
+    embed.set_footer(text=f"Category: {best.category} • Copy the page into your AI assistant with your file")
+
+    await reply(ctx, embed=embed)
 
 
 @bot.command(name='ping', help='Check bot status and latency')
@@ -473,7 +760,7 @@ async def ping(ctx):
     
     embed.timestamp = datetime.utcnow()
     
-    await ctx.send(embed=embed)
+    await reply(ctx, embed=embed)
 
 
 @bot.command(name='invite', help='Get the PANDAUDIT website link')
@@ -509,7 +796,7 @@ async def invite(ctx):
         inline=False
     )
     
-    await ctx.send(embed=embed)
+    await reply(ctx, embed=embed)
 
 
 @bot.command(name='help', help='Show all available commands')
@@ -529,9 +816,9 @@ async def help_command(ctx, command_name: Optional[str] = None):
                 value=f"`!{command.name} {command.signature}`",
                 inline=False
             )
-            await ctx.send(embed=embed)
+            await reply(ctx, embed=embed)
         else:
-            await ctx.send(f"❌ Command `{command_name}` not found.")
+            await reply(ctx, f"❌ Command `{command_name}` not found.")
         return
     
     # Show all commands
@@ -549,7 +836,9 @@ async def help_command(ctx, command_name: Optional[str] = None):
         "**!unmute** `@user` - Unmute a user",
         "**!clear** `[number]` - Delete messages (default 10)",
         "**!warn** `@user [reason]` - Warn a user",
-        "**!warnings** `@user` - View user's warnings"
+        "**!warnings** `@user` - View user's warnings",
+        "**!outbound** - Outbound API queue depth and wait times (admins)",
+        "**!profile** `cpu|sample|memory [seconds]` - Profile the bot; also `stop`, `caches`, `tasks` (admins)"
     ]
     embed.add_field(
         name="🛡️ Moderation Commands",
@@ -562,6 +851,8 @@ async def help_command(ctx, command_name: Optional[str] = None):
         "**!help** `[command]` - Show this help message",
         "**!about** - Learn about PANDAUDIT",
         "**!latest** - Get the latest blog post",
+        "**!skill** `<query>` - Find a skill in the skills library",
+        "**!activity** `[#channel] [window]` - Message activity (e.g. 6h, 7d)",
         "**!ping** - Check bot status",
         "**!invite** - Get pandaudit.com link"
     ]
@@ -579,7 +870,7 @@ async def help_command(ctx, command_name: Optional[str] = None):
     
     embed.set_footer(text="PANDAUDIT Bot • Prefix: !")
     
-    await ctx.send(embed=embed)
+    await reply(ctx, embed=embed)
 
 
 @bot.command(name='stats', help='Show server statistics')
@@ -613,7 +904,141 @@ async def stats(ctx):
     
     embed.timestamp = datetime.utcnow()
     
-    await ctx.send(embed=embed)
+    await reply(ctx, embed=embed)
+
+
+@bot.command(name='activity', help='Message activity for the server or a channel (e.g. !activity #general 6h)')
+async def activity_command(ctx, channel: Optional[discord.TextChannel] = None, window: str = '24h'):
+    """Show rolling message counts; reads the in-memory counters only."""
+    seconds = parse_window(window)
+    if seconds is None:
+        await reply(ctx, "❌ Window must look like `30m`, `6h` or `7d` (up to 30d).")
+        return
+
+    now = time.time()
+    guild = ctx.guild
+    if channel:
+        total = activity.channels.total(channel.id, seconds, now)
+        resolution, series = activity.channels.series(channel.id, seconds, now)
+        title = f"📈 Activity in #{channel.name}"
+    else:
+        total = activity.guilds.total(guild.id, seconds, now)
+        resolution, series = activity.guilds.series(guild.id, seconds, now)
+        title = f"📈 Activity in {guild.name}"
+
+    embed = discord.Embed(
+        title=title,
+        description=f"**{total:,}** message(s) in the last {window}",
+        color=discord.Color.blue()
+    )
+    embed.add_field(name=f"Per {resolution}", value=f"`{sparkline(series)}`", inline=False)
+
+    if channel:
+        server_total = activity.guilds.total(guild.id, seconds, now)
+        if server_total:
+            embed.add_field(name="Share of Server", value=f"{total / server_total:.0%}", inline=True)
+    else:
+        busiest = activity.channels.top(seconds, now, 5, keys=activity.guild_channels(guild.id))
+        if busiest:
+            embed.add_field(
+                name="💬 Busiest Channels",
+                value="\n".join(f"<#{channel_id}> — {count:,}" for channel_id, count in busiest),
+                inline=False
+            )
+        members = [key for key in activity.members.rows if key[0] == guild.id]
+        posters = activity.members.top(seconds, now, 5, keys=members)
+        if posters:
+            embed.add_field(
+                name="🏅 Top Posters",
+                value="\n".join(f"<@{user_id}> — {count:,}" for (_, user_id), count in posters),
+                inline=False
+            )
+
+    embed.set_footer(text=f"Counted live since {activity_since:%Y-%m-%d %H:%M} UTC")
+    await reply(ctx, embed=embed)
+
+
+@bot.command(name='outbound', help='Show the outbound API queue (admins)')
+@commands.has_permissions(administrator=True)
+async def outbound_stats(ctx):
+    """Queue depth, drops and wait times for each priority class."""
+    embed = discord.Embed(
+        title="📮 Outbound Queue",
+        description=f"Queued: {outbound.depth}" + (" (saturated)" if outbound.saturated else ""),
+        color=discord.Color.orange() if outbound.saturated else discord.Color.blue()
+    )
+    for name, s in outbound.snapshot().items():
+        embed.add_field(
+            name=name.title(),
+            value=f"Depth {s['depth']} • Sent {s['sent']} • Failed {s['failed']}\n"
+                  f"Dropped {s['dropped']} • Merged {s['coalesced']}\n"
+                  f"Wait p50 {s['wait_p50']:.2f}s • p95 {s['wait_p95']:.2f}s • max {s['wait_max']:.2f}s",
+            inline=False
+        )
+    embed.timestamp = datetime.utcnow()
+    await reply(ctx, embed=embed)
+
+
+@bot.command(name='profile', help='Profile the bot: cpu|sample|memory [seconds], stop, caches or tasks (admins)')
+@commands.has_permissions(administrator=True)
+async def profile_command(ctx, action: str, seconds: Optional[int] = 30):
+    """Run a profiling session and attach the reports, or dump caches / tasks."""
+    action = action.lower()
+    stamp = datetime.utcnow().strftime('%Y%m%d-%H%M%S')
+
+    if action == 'stop':
+        if profiler.cancel():
+            await reply(ctx, f"⏹️ Stopping the {profiler.mode} session; the reports follow.")
+        else:
+            await reply(ctx, "❌ No profiling session is running.")
+        return
+
+    if action == 'caches':
+        rows = cache_report({
+            'warnings': warnings,
+            'muted_users': muted_users,
+            'automod members': automod.members,
+            'activity counters': activity,
+            'skill index': skill_index,
+            'feed entries': feed_poller.entries,
+            'welcome batcher': welcome_batcher,
+            'outbound queue': outbound.queues,
+            'outbound buckets': outbound.buckets,
+            'discord message cache': bot.cached_messages,
+            'discord users': bot.users,
+        })
+        embed = discord.Embed(title="🗄️ Largest Caches", color=discord.Color.blue())
+        embed.description = "\n".join(
+            f"**{name}** — {size / 1024:,.1f} KiB" + (f" ({items:,} items)" if items is not None else "")
+            for name, items, size in rows[:8])
+        embed.set_footer(text="Library objects (messages, members) are counted shallowly")
+        await reply(ctx, embed=embed, file=discord.File(
+            io.BytesIO(format_cache_report(rows).encode()), filename=f'caches-{stamp}.txt'))
+        return
+
+    if action == 'tasks':
+        await reply(ctx, "🧵 Pending tasks:", file=discord.File(
+            io.BytesIO(task_dump().encode()), filename=f'tasks-{stamp}.txt'))
+        return
+
+    if action not in PROFILE_MODES:
+        await reply(ctx, f"❌ Use `!profile {'|'.join(PROFILE_MODES)} [seconds]`, `stop`, `caches` or `tasks`.")
+        return
+    if profiler.active:
+        await reply(ctx, f"❌ A {profiler.mode} session is already running (`!profile stop` ends it).")
+        return
+    seconds = max(1, min(seconds, config.PROFILE_MAX_SECONDS))
+
+    profiler.start(action)
+    await reply(ctx, f"⏱️ Profiling ({action}) for {seconds}s...")
+    try:
+        await profiler.run_for(seconds)
+    finally:
+        reports = profiler.stop()
+    files = [discord.File(io.BytesIO(data), filename=f'{action}-{stamp}-{name}')
+             for name, data in reports.items()]
+    await reply(ctx, f"📊 {action} profile ready.", files=files)
+    logger.info(f'{ctx.author.name} ran a {action} profile')
 
 
 # ============================================================================
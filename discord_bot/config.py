@@ -52,9 +52,60 @@ MAX_BULK_DELETE = 100
 AUTO_REACT_CHANNELS = ['blog-updates']
 AUTO_REACT_EMOJIS = ['👍', '💬', '🔖']
 
+# AutoMod (automod.py): (count, seconds) limits per member. Hitting one
+# deletes the message and warns; floods and mention spam also mute for
+# DEFAULT_MUTE_DURATION. Members with Manage Messages are exempt.
+AUTOMOD_ENABLED = os.getenv('AUTOMOD_ENABLED', 'true').lower() == 'true'
+AUTOMOD_RATE = (6, 5.0)          # messages (at most 8)
+AUTOMOD_DUPLICATES = (3, 30.0)   # identical messages (at most 8)
+AUTOMOD_MENTIONS = (8, 10.0)     # user and role mentions
+AUTOMOD_LINKS = (5, 10.0)        # links
+AUTOMOD_COOLDOWN_SECONDS = 30.0  # further violations only delete
+
+# Welcome messages: joins within WELCOME_BATCH_SECONDS share one welcome, and
+# the window doubles while joins keep coming, up to WELCOME_MAX_BATCH_SECONDS.
+# RAID_JOIN_THRESHOLD joins within RAID_WINDOW_SECONDS switch to a summary.
+WELCOME_CHANNELS = ['welcome', 'general', 'introductions']
+WELCOME_BATCH_SECONDS = 3.0
+WELCOME_MAX_BATCH_SECONDS = 60.0
+WELCOME_MAX_MENTIONS = 25
+RAID_JOIN_THRESHOLD = 20
+RAID_WINDOW_SECONDS = 10.0
+
+# Outbound API scheduler (outbound.py): route kind -> (calls, per seconds),
+# kept under Discord's limits so moderation never queues behind a 429.
+# Past OUTBOUND_SATURATION_DEPTH queued calls, new reactions are dropped.
+OUTBOUND_ROUTE_BUDGETS = {
+    'members': (10, 10.0),   # kicks, bans and role changes, per guild
+    'channel': (5, 5.0),     # messages, deletes and permission edits, per channel
+    'reactions': (4, 1.0),   # reactions, per channel
+    'dm': (5, 5.0),          # direct messages, all users
+}
+OUTBOUND_GLOBAL_BUDGET = (45, 1.0)
+OUTBOUND_SATURATION_DEPTH = 200
+
+# Rolling activity counters behind !activity (fixed memory: rows beyond
+# these limits reuse the least recently active channel/member)
+ACTIVITY_MAX_CHANNELS = 500
+ACTIVITY_MAX_MEMBERS = 5000
+
+# Longest !profile session, in seconds
+PROFILE_MAX_SECONDS = 300
+
+# Blog feed polling: posts new feed items to #blog-updates. Off by default,
+# because the GitHub webhook workflow (notify_discord.py) already announces
+# new posts there; turn this on only if that workflow is disabled.
+FEED_POLL_SECONDS = int(os.getenv('FEED_POLL_SECONDS', '0'))
+FEED_CACHE_SIZE = 20
+
 # Website URLs
 WEBSITE_URL = 'https://pandaudit.com'
 BLOG_URL = 'https://pandaudit.com/blog'
 ABOUT_URL = 'https://pandaudit.com/aboutme'
 CHEATSHEET_URL = 'https://pandaudit.com/cheatsheet'
 STORIES_URL = 'https://pandaudit.com/stories'
+FEED_URL = os.getenv('FEED_URL', 'https://pandaudit.com/feed.xml')
+
+# Skills library (!skill); the URL mirrors the skills collection permalink in _config.yml
+SKILLS_DIR = os.getenv('SKILLS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '_skills'))
+SKILL_URL = 'https://pandaudit.com/skills/{name}/'
@@ -0,0 +1,428 @@
+"""Export message history from the server's channels to Parquet.
+
+Pages through each channel's history oldest-first over the REST API, a few
+channels at a time, and writes rows to Parquet as they arrive: a batch of
+rows is the most that's ever held in memory. Each channel keeps a cursor
+(the newest exported message id), so the next run only fetches what's new.
+
+Output, one directory per channel (hive-style, so pandas/pyarrow read the
+whole export as one dataset with a `channel` column):
+
+    history_export/channel=reconciliations/000123...-000456....parquet
+    history_export/_cursors.json
+
+A part file is renamed into place and the cursor saved only once the part
+is complete, so an interrupted run loses at most one part and resumes
+cleanly. A channel the bot can't read (403), or whose requests fail
+(dropped connection, timeout), is reported and skipped; the others carry
+on. Message text is left out unless --content is given; the export is
+meant for activity analysis.
+
+Run with --benchmark to export synthetic history from a local stand-in for
+the REST API (no token needed) and check the result.
+
+Usage:
+    DISCORD_BOT_TOKEN=... python3 export_history.py
+    DISCORD_BOT_TOKEN=... python3 export_history.py --channels reconciliations skills --content
+    python3 export_history.py --benchmark 2000000
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import os
+from pathlib import Path
+import sys
+import time
+
+import aiohttp
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from setup_server import API, GUILD_ID, STRUCTURE
+
+PAGE_SIZE = 100           # Discord's maximum per request
+BATCH_ROWS = 50_000       # rows buffered before they're written as a row group
+PART_ROWS = 1_000_000     # rows per part file; the cursor advances per part
+DISCORD_EPOCH_MS = 1420070400000
+
+SCHEMA = pa.schema([
+    ("message_id", pa.uint64()),
+    ("channel_id", pa.uint64()),
+    ("timestamp", pa.timestamp("ms", tz="UTC")),
+    ("author_id", pa.uint64()),
+    ("author", pa.string()),
+    ("bot", pa.bool_()),
+    ("type", pa.uint8()),
+    ("reply_to", pa.uint64()),
+    ("edited", pa.bool_()),
+    ("content_length", pa.int32()),
+    ("mentions", pa.int16()),
+    ("attachments", pa.int16()),
+    ("embeds", pa.int16()),
+    ("reactions", pa.int32()),
+])
+CONTENT_FIELD = pa.field("content", pa.string())
+
+
+class Cursors:
+    """Newest exported message id per channel, saved atomically."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.ids = json.loads(path.read_text()) if path.exists() else {}
+
+    def get(self, channel_id: str) -> int:
+        return int(self.ids.get(channel_id, 0))
+
+    def advance(self, channel_id: str, message_id: int):
+        self.ids[channel_id] = str(message_id)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.ids, indent=2, sort_keys=True))
+        tmp.replace(self.path)
+
+
+class Api:
+    """Minimal async REST client that waits out rate limits."""
+
+    def __init__(self, session: aiohttp.ClientSession, base: str):
+        self.session = session
+        self.base = base.rstrip("/")
+
+    async def get(self, path: str, **params):
+        while True:
+            async with self.session.get(f"{self.base}{path}", params=params) as r:
+                if r.status == 429:
+                    await asyncio.sleep(float((await r.json()).get("retry_after", 1)) + 0.1)
+                    continue
+                r.raise_for_status()
+                data = await r.json()
+                # Out of budget for this bucket: wait before the next call
+                if r.headers.get("X-RateLimit-Remaining") == "0":
+                    await asyncio.sleep(float(r.headers.get("X-RateLimit-Reset-After", 1)))
+                return data
+
+
+class PartWriter:
+    """Buffers rows column-wise and streams them into Parquet part files."""
+
+    def __init__(self, out_dir: Path, channel_id: int, with_content: bool):
+        self.out_dir = out_dir
+        self.channel_id = channel_id
+        self.schema = SCHEMA.append(CONTENT_FIELD) if with_content else SCHEMA
+        self.columns = {name: [] for name in self.schema.names}
+        self.writer = None
+        self.tmp_path = None
+        self.first_id = None
+        self.last_id = None
+        self.part_rows = 0
+
+    def add(self, msg: dict, channel_id: int):
+        mid = int(msg["id"])
+        c = self.columns
+        c["message_id"].append(mid)
+        c["channel_id"].append(channel_id)
+        c["timestamp"].append((mid >> 22) + DISCORD_EPOCH_MS)  # from the snowflake, no parsing
+        author = msg.get("author") or {}
+        c["author_id"].append(int(author.get("id", 0)))
+        c["author"].append(author.get("username"))
+        c["bot"].append(bool(author.get("bot", False)))
+        c["type"].append(msg.get("type", 0))
+        ref = msg.get("message_reference") or {}
+        c["reply_to"].append(int(ref["message_id"]) if "message_id" in ref else None)
+        c["edited"].append(msg.get("edited_timestamp") is not None)
+        content = msg.get("content") or ""
+        c["content_length"].append(len(content))
+        c["mentions"].append(len(msg.get("mentions") or ()))
+        c["attachments"].append(len(msg.get("attachments") or ()))
+        c["embeds"].append(len(msg.get("embeds") or ()))
+        c["reactions"].append(sum(r.get("count", 0) for r in msg.get("reactions") or ()))
+        if "content" in c:
+            c["content"].append(content)
+        if self.first_id is None:
+            self.first_id = mid
+        self.last_id = mid
+        self.part_rows += 1
+        if len(c["message_id"]) >= BATCH_ROWS:
+            self._flush()
+
+    def _flush(self):
+        if not self.columns["message_id"]:
+            return
+        if self.writer is None:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            # Keyed by channel id: channels can share a name, and so a directory
+            self.tmp_path = self.out_dir / f".part-{self.channel_id}.parquet.tmp"
+            self.writer = pq.ParquetWriter(self.tmp_path, self.schema, compression="zstd")
+        batch = pa.record_batch([pa.array(self.columns[f.name], type=f.type) for f in self.schema],
+                                schema=self.schema)
+        self.writer.write_batch(batch)
+        for col in self.columns.values():
+            col.clear()
+
+    @property
+    def part_full(self) -> bool:
+        return self.part_rows >= PART_ROWS
+
+    def close_part(self):
+        """Finish the current part file; returns (last message id, rows)."""
+        self._flush()
+        if self.writer is None:
+            return None, 0
+        self.writer.close()
+        final = self.out_dir / f"{self.first_id:020d}-{self.last_id:020d}.parquet"
+        self.tmp_path.replace(final)
+        result = (self.last_id, self.part_rows)
+        self.writer = None
+        self.first_id = None
+        self.part_rows = 0
+        return result
+
+
+async def export_channel(api: Api, channel: dict, out_root: Path, cursors: Cursors,
+                         with_content: bool) -> int:
+    """Fetch everything after the channel's cursor, oldest first.
+
+    If a request fails part way, the pages already fetched are still
+    written and the cursor advanced past them before the error propagates.
+    """
+    channel_id = channel["id"]
+    after = cursors.get(channel_id)
+    writer = PartWriter(out_root / f"channel={channel['name']}", int(channel_id), with_content)
+    total = 0
+    started = time.perf_counter()
+    try:
+        while True:
+            page = await api.get(f"/channels/{channel_id}/messages", after=after, limit=PAGE_SIZE)
+            if not page:
+                break
+            # With `after`, Discord returns the next page newest-first
+            page.sort(key=lambda m: int(m["id"]))
+            for msg in page:
+                writer.add(msg, int(channel_id))
+            after = int(page[-1]["id"])
+            if writer.part_full:
+                last_id, rows = writer.close_part()
+                cursors.advance(channel_id, last_id)
+                total += rows
+            if len(page) < PAGE_SIZE:
+                break
+    finally:
+        last_id, rows = writer.close_part()
+        if last_id is not None:
+            cursors.advance(channel_id, last_id)
+            total += rows
+    print(f"  #{channel['name']}: {total:,} new message(s) in {time.perf_counter() - started:.1f}s")
+    return total
+
+
+async def run(args) -> int:
+    out_root = Path(args.out)
+    out_root.mkdir(parents=True, exist_ok=True)
+    cursors = Cursors(out_root / "_cursors.json")
+    wanted = set(args.channels or (name for _, chans in STRUCTURE for name, _, _ in chans))
+
+    headers = {"Authorization": f"Bot {args.token}"}
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(headers=headers, connector=connector) as session:
+        api = Api(session, args.api)
+        channels = [c for c in await api.get(f"/guilds/{args.guild}/channels")
+                    if c["type"] == 0 and c["name"] in wanted]
+        missing = wanted - {c["name"] for c in channels}
+        if missing:
+            print(f"Not found on the server (skipped): {', '.join(sorted(missing))}")
+
+        # Bounded concurrency: a few channels page at once, each one sequentially
+        queue: asyncio.Queue = asyncio.Queue()
+        for channel in channels:
+            queue.put_nowait(channel)
+        totals = []
+        skipped = []
+
+        async def worker():
+            while not queue.empty():
+                channel = queue.get_nowait()
+                try:
+                    totals.append(await export_channel(api, channel, out_root, cursors, args.content))
+                except aiohttp.ClientResponseError as e:
+                    # e.g. 403 for a channel the bot can't read: skip it, keep the rest going
+                    skipped.append(channel["name"])
+                    print(f"  #{channel['name']}: skipped ({e.status} {e.message})")
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    # Dropped connection or timeout: the parts written so far are
+                    # kept (the cursor resumes there next run); move on to the next
+                    skipped.append(channel["name"])
+                    print(f"  #{channel['name']}: skipped ({e!r})")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(min(args.concurrency, len(channels)) or 1)))
+        elapsed = time.perf_counter() - started
+
+    total = sum(totals)
+    rate = total / elapsed if elapsed else 0
+    print(f"Exported {total:,} message(s) from {len(channels) - len(skipped)} channel(s) in "
+          f"{elapsed:.1f}s ({rate:,.0f} msg/s) to {out_root}/")
+    if skipped:
+        print(f"Skipped (no access or request failed): {', '.join(sorted(skipped))}")
+    return 0
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+class _SyntheticChannel:
+    """A channel's history as a lazy, sorted sequence of message ids: message
+    i is one second after message i - 1, so millions cost no memory."""
+
+    def __init__(self, index: int, count: int):
+        self.index = index
+        self.count = count
+        self.start_ms = 1_600_000_000_000 + index * 7
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i: int) -> int:
+        return ((self.start_ms + i * 1000 - DISCORD_EPOCH_MS) << 22) | (self.index << 12)
+
+    def message(self, i: int) -> dict:
+        user = (i * 7919) % 5000
+        msg = {"id": str(self[i]), "type": 0, "content": f"message {i} in channel {self.index}",
+               "author": {"id": str(10_000 + user), "username": f"user{user}", "bot": user == 0},
+               "edited_timestamp": None if i % 20 else "2024-01-01T00:00:00+00:00",
+               "mentions": [], "attachments": [], "embeds": []}
+        if i % 10 == 3:
+            msg["message_reference"] = {"message_id": str(self[i - 1])}
+        if i % 25 == 0:
+            msg["reactions"] = [{"count": 2, "emoji": {"name": "👍"}}]
+        return msg
+
+
+async def _standin(channels: dict, forbidden: set):
+    """Local stand-in for the REST endpoints the export uses. Returns 429
+    now and then and marks some responses as the end of a rate-limit bucket."""
+    from aiohttp import web
+
+    requests = [0]
+
+    async def guild_channels(request):
+        return web.json_response([{"id": cid, "name": name, "type": 0}
+                                  for cid, (name, _) in channels.items()])
+
+    async def messages(request):
+        requests[0] += 1
+        if requests[0] % 997 == 0:
+            return web.json_response({"message": "You are being rate limited.", "retry_after": 0.01},
+                                     status=429)
+        cid = request.match_info["channel_id"]
+        if cid in forbidden:
+            return web.json_response({"message": "Missing Access", "code": 50001}, status=403)
+        history = channels[cid][1]
+        start = bisect.bisect_right(history, int(request.query.get("after", 0)))
+        stop = min(start + int(request.query.get("limit", PAGE_SIZE)), len(history))
+        page = [history.message(i) for i in range(stop - 1, start - 1, -1)]   # newest first
+        headers = {"X-RateLimit-Remaining": "0" if requests[0] % 50 == 0 else "4",
+                   "X-RateLimit-Reset-After": "0.001"}
+        return web.json_response(page, headers=headers)
+
+    app = web.Application()
+    app.router.add_get("/guilds/{guild_id}/channels", guild_channels)
+    app.router.add_get("/channels/{channel_id}/messages", messages)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+
+def _benchmark(messages: int = 2_000_000, channel_count: int = 10):
+    """Export `messages` synthetic messages through the stand-in, then check
+    the dataset, a resumed run and an incremental run."""
+    import resource
+    import shutil
+    import tempfile
+
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    # Two channels share a name (their part files must not collide) and one
+    # is forbidden (it must be skipped without stopping the others)
+    names = [f"chan-{i}" for i in range(channel_count - 1)] + ["chan-0"]
+    per_channel = messages // channel_count
+    channels = {str(900 + i): (names[i], _SyntheticChannel(i, per_channel + i))
+                for i in range(channel_count)}
+    forbidden = {"903"}
+    readable = {cid: history for cid, (_, history) in channels.items() if cid not in forbidden}
+    out = Path(tempfile.mkdtemp(prefix="export_bench_"))
+
+    async def export(api_url: str):
+        args = argparse.Namespace(out=str(out), channels=sorted(set(names)), concurrency=3,
+                                  content=False, guild="1", api=api_url, token="benchmark")
+        started = time.perf_counter()
+        await run(args)
+        return time.perf_counter() - started
+
+    async def scenario():
+        runner, api_url = await _standin(channels, forbidden)
+        try:
+            print(f"Full export of {sum(len(h) for h in readable.values()):,} messages:")
+            full = await export(api_url)
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # before the checks
+            rows = ds.dataset(out, format="parquet", partitioning="hive").to_table(
+                columns=["message_id", "channel_id"])
+            expected = sum(len(h) for h in readable.values())
+            assert rows.num_rows == expected, (rows.num_rows, expected)
+            assert pc.count_distinct(rows.column("message_id")).as_py() == expected
+            cursors = json.loads((out / "_cursors.json").read_text())
+            assert {cid: int(v) for cid, v in cursors.items()} == {cid: h[len(h) - 1] for cid, h in readable.items()}
+            assert not list(out.rglob("*.tmp"))
+
+            print("Resumed run, nothing new:")
+            await export(api_url)
+            for history in readable.values():
+                history.count += 1234
+            print("Incremental run, 1,234 new messages per channel:")
+            incremental = await export(api_url)
+            rows = ds.dataset(out, format="parquet", partitioning="hive").to_table(columns=["message_id"])
+            assert rows.num_rows == expected + 1234 * len(readable)
+            assert pc.count_distinct(rows.column("message_id")).as_py() == rows.num_rows
+            return expected, full, incremental, peak
+        finally:
+            await runner.cleanup()
+
+    try:
+        expected, full, incremental, peak = asyncio.run(scenario())
+        size = sum(f.stat().st_size for f in out.rglob("*.parquet"))
+        print(f"\nChecks passed. Full export {expected:,} msgs in {full:.1f}s "
+              f"({expected / full:,.0f} msg/s), incremental {incremental:.1f}s, "
+              f"{size / 2**20:.1f} MiB of Parquet, peak RSS {peak:.0f} MiB (stand-in included)")
+    finally:
+        shutil.rmtree(out, ignore_errors=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", nargs="*", help="channel names (default: every channel in STRUCTURE)")
+    parser.add_argument("--out", default="history_export", help="output directory")
+    parser.add_argument("--concurrency", type=int, default=3, help="channels fetched at once")
+    parser.add_argument("--content", action="store_true", help="include message text")
+    parser.add_argument("--guild", default=GUILD_ID)
+    parser.add_argument("--api", default=API, help="REST base URL")
+    parser.add_argument("--benchmark", type=int, nargs="?", const=2_000_000, metavar="MESSAGES",
+                        help="export synthetic history from a local stand-in and check it")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        _benchmark(args.benchmark)
+        return 0
+
+    args.token = os.environ.get("DISCORD_BOT_TOKEN")
+    if not args.token:
+        print("Set DISCORD_BOT_TOKEN in the environment.")
+        return 1
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
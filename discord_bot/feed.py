@@ -0,0 +1,112 @@
+"""Conditional-GET poller for the pandaudit.com RSS feed.
+
+Fetches feed.xml with ETag / If-Modified-Since over a shared aiohttp
+session, so an unchanged feed costs one tiny 304 round trip. The body is
+parsed incrementally and parsing stops at the first item already seen,
+because the feed lists newest posts first.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional
+import xml.etree.ElementTree as ET
+
+import aiohttp
+
+
+@dataclass(frozen=True)
+class FeedEntry:
+    guid: str
+    title: str
+    link: str
+    description: str
+    published: str
+
+
+class FeedPoller:
+    """Keeps the last `cache_size` feed entries and reports only new ones."""
+
+    def __init__(self, url: str, cache_size: int = 20, timeout: float = 15.0):
+        self.url = url
+        self.cache_size = cache_size
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.entries: "OrderedDict[str, FeedEntry]" = OrderedDict()  # newest first
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.primed = False
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def latest(self) -> Optional[FeedEntry]:
+        return next(iter(self.entries.values()), None)
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+
+    async def poll(self) -> List[FeedEntry]:
+        """Fetch the feed and return entries not seen before, oldest first.
+
+        The first successful poll only fills the cache, so a restart never
+        re-announces posts that are already out.
+        """
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                connector=aiohttp.TCPConnector(limit=2, ttl_dns_cache=3600),
+            )
+
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+
+        async with self.session.get(self.url, headers=headers) as resp:
+            if resp.status == 304:
+                return []
+            resp.raise_for_status()
+            fresh = await self._parse_new(resp)
+            self.etag = resp.headers.get('ETag', self.etag)
+            self.last_modified = resp.headers.get('Last-Modified', self.last_modified)
+
+        for entry in reversed(fresh):
+            self.entries[entry.guid] = entry
+            self.entries.move_to_end(entry.guid, last=False)
+        while len(self.entries) > self.cache_size:
+            self.entries.popitem(last=True)
+
+        if not self.primed:
+            self.primed = True
+            return []
+        return list(reversed(fresh))
+
+    async def _parse_new(self, resp) -> List[FeedEntry]:
+        parser = ET.XMLPullParser(events=('end',))
+        fresh: List[FeedEntry] = []
+        async for chunk in resp.content.iter_chunked(8192):
+            parser.feed(chunk)
+            for _, elem in parser.read_events():
+                if elem.tag != 'item':
+                    continue
+                entry = _entry_from_item(elem)
+                elem.clear()
+                if entry.guid in self.entries:
+                    return fresh  # everything after this is already cached
+                fresh.append(entry)
+                if len(fresh) >= self.cache_size:
+                    return fresh
+        return fresh
+
+
+def _entry_from_item(item) -> FeedEntry:
+    def text(tag):
+        return ' '.join((item.findtext(tag) or '').split())
+
+    link = text('link')
+    return FeedEntry(
+        guid=text('guid') or link,
+        title=text('title'),
+        link=link,
+        description=text('description'),
+        published=text('pubDate'),
+    )
@@ -0,0 +1,268 @@
+"""Central queue for the bot's outbound Discord API calls.
+
+Handlers submit actions instead of awaiting the API directly, command
+replies included (``Priority.REPLY``). Each action
+has a priority class and a route (the rate-limit bucket it draws from,
+e.g. ``members:<guild id>`` or ``reactions:<channel id>``). One dispatcher
+sends the highest-priority action whose route has budget left, so a flood
+of reactions can't use up the budget a kick or ban needs.
+
+Actions that share a coalescing key are merged while queued. Once the
+queue is saturated, new cosmetic actions are dropped on arrival, and
+queued ones are dropped when they outlive their ttl. Queue depth and wait
+times per priority are kept for ``!outbound``.
+"""
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+import logging
+import time
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger('pandaudit_bot')
+
+
+class Priority(IntEnum):
+    MODERATION = 0  # kick, ban, roles, purges
+    REPLY = 1       # answers to commands
+    NOTIFY = 2      # welcomes, feed posts, DMs
+    COSMETIC = 3    # reactions, delayed cleanup
+
+
+class TokenBucket:
+    """`capacity` calls per `per` seconds, refilled continuously."""
+
+    def __init__(self, capacity: int, per: float):
+        self.capacity = capacity
+        self.rate = capacity / per
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def ready_in(self, now: float) -> float:
+        """Seconds until one call is allowed (0 if it is now)."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+@dataclass
+class Action:
+    priority: Priority
+    route: str
+    call: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    key: Optional[Hashable] = None
+    not_before: float = 0.0
+    deadline: Optional[float] = None
+
+
+@dataclass
+class PriorityStats:
+    submitted: int = 0
+    sent: int = 0
+    failed: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    waits: Deque[float] = field(default_factory=lambda: deque(maxlen=500))
+
+    def wait_percentiles(self) -> Tuple[float, float, float]:
+        """p50, p95 and max queue wait in seconds over recent sends."""
+        if not self.waits:
+            return 0.0, 0.0, 0.0
+        ordered = sorted(self.waits)
+        return (ordered[len(ordered) // 2],
+                ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                ordered[-1])
+
+
+class OutboundScheduler:
+    """Priority queue of API calls with per-route and global budgets."""
+
+    def __init__(self, route_budgets: Dict[str, Tuple[int, float]],
+                 global_budget: Tuple[int, float] = (50, 1.0),
+                 default_budget: Tuple[int, float] = (5, 5.0),
+                 saturation_depth: int = 200, cosmetic_ttl: float = 30.0,
+                 max_in_flight: int = 8):
+        self.route_budgets = route_budgets  # route kind -> (calls, per seconds)
+        self.default_budget = default_budget
+        self.global_bucket = TokenBucket(*global_budget)
+        self.saturation_depth = saturation_depth
+        self.cosmetic_ttl = cosmetic_ttl
+        self.queues: Dict[Priority, List[Action]] = {p: [] for p in Priority}
+        self.by_key: Dict[Hashable, Action] = {}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.stats: Dict[Priority, PriorityStats] = {p: PriorityStats() for p in Priority}
+        self.max_in_flight = max_in_flight
+        self._wake: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        return sum(len(q) for q in self.queues.values())
+
+    @property
+    def saturated(self) -> bool:
+        return self.depth >= self.saturation_depth
+
+    def _bucket(self, route: str) -> TokenBucket:
+        bucket = self.buckets.get(route)
+        if bucket is None:
+            kind = route.split(':', 1)[0]
+            bucket = self.buckets[route] = TokenBucket(*self.route_budgets.get(kind, self.default_budget))
+        return bucket
+
+    def submit(self, priority: Priority, route: str, call: Callable[[], Awaitable[Any]], *,
+               key: Optional[Hashable] = None, delay: float = 0.0,
+               ttl: Optional[float] = None) -> asyncio.Future:
+        """Queue `call` (a zero-argument coroutine function) and return a
+        future for its result.
+
+        `key` merges this action into a queued one with the same key (the
+        earlier caller gets the same result). `delay` holds the action back,
+        and `ttl` drops it if it can't be sent in time; cosmetic actions
+        default to `cosmetic_ttl`. Dropped actions resolve to None.
+        """
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._task = loop.create_task(self._run())
+
+        stats = self.stats[priority]
+        stats.submitted += 1
+        future = loop.create_future()
+
+        if key is not None and key in self.by_key:
+            stats.coalesced += 1
+            existing = self.by_key[key].future
+            existing.add_done_callback(lambda f: _copy_result(f, future))
+            return future
+        if priority is Priority.COSMETIC and self.saturated:
+            stats.dropped += 1
+            future.set_result(None)
+            return future
+
+        now = time.monotonic()
+        if ttl is None and priority is Priority.COSMETIC:
+            ttl = self.cosmetic_ttl
+        action = Action(priority, route, call, future, key, not_before=now + delay,
+                        deadline=now + delay + ttl if ttl is not None else None)
+        self.queues[priority].append(action)
+        if key is not None:
+            self.by_key[key] = action
+        self._wake.set()
+        return future
+
+    def post(self, priority: Priority, route: str, call: Callable[[], Awaitable[Any]], **kwargs):
+        """submit() for fire-and-forget actions. Nobody awaits the result,
+        so a failure is logged here instead."""
+        self.submit(priority, route, call, **kwargs).add_done_callback(_log_failure)
+
+    def _take_next(self, now: float) -> Tuple[Optional[Action], Optional[float]]:
+        """Highest-priority action that may go now, else how long to wait."""
+        wait: Optional[float] = None
+        global_wait = self.global_bucket.ready_in(now)
+        for priority in Priority:
+            queue = self.queues[priority]
+            i = 0
+            while i < len(queue):
+                action = queue[i]
+                if action.deadline is not None and now > action.deadline:
+                    self._unqueue(queue, i)
+                    self.stats[priority].dropped += 1
+                    action.future.set_result(None)
+                    continue
+                ready_in = max(action.not_before - now, self._bucket(action.route).ready_in(now))
+                if ready_in == 0 and global_wait == 0:
+                    self._unqueue(queue, i)
+                    self._bucket(action.route).take()
+                    self.global_bucket.take()
+                    return action, None
+                ready_in = max(ready_in, global_wait)
+                wait = ready_in if wait is None else min(wait, ready_in)
+                i += 1
+        return None, wait
+
+    def _unqueue(self, queue: List[Action], i: int):
+        action = queue.pop(i)
+        if action.key is not None and self.by_key.get(action.key) is action:
+            del self.by_key[action.key]
+
+    async def _run(self):
+        while True:
+            action, wait = self._take_next(time.monotonic())
+            if action is None:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._slots.acquire()
+            asyncio.get_running_loop().create_task(self._execute(action))
+
+    async def _execute(self, action: Action):
+        stats = self.stats[action.priority]
+        stats.waits.append(time.monotonic() - action.not_before)
+        try:
+            result = await action.call()
+        except Exception as e:
+            stats.failed += 1
+            if not action.future.done():
+                action.future.set_exception(e)
+        else:
+            stats.sent += 1
+            if not action.future.done():
+                action.future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Per-priority queue depth, counters and wait times (seconds)."""
+        report = {}
+        for priority in Priority:
+            s = self.stats[priority]
+            p50, p95, worst = s.wait_percentiles()
+            report[priority.name.lower()] = {
+                'depth': len(self.queues[priority]), 'submitted': s.submitted,
+                'sent': s.sent, 'failed': s.failed, 'dropped': s.dropped,
+                'coalesced': s.coalesced, 'wait_p50': p50, 'wait_p95': p95, 'wait_max': worst,
+            }
+        return report
+
+    async def close(self):
+        """Stop dispatching; anything still queued resolves to None."""
+        if self._task:
+            self._task.cancel()
+        for queue in self.queues.values():
+            for action in queue:
+                if not action.future.done():
+                    action.future.set_result(None)
+            queue.clear()
+        self.by_key.clear()
+
+
+def _copy_result(source: asyncio.Future, target: asyncio.Future):
+    if target.done():
+        return
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+def _log_failure(future: asyncio.Future):
+    # Only for post(): awaited actions raise to their caller, which handles
+    # (and logs) the error itself
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning(f'Outbound action failed: {future.exception()}')
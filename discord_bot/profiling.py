@@ -0,0 +1,337 @@
+"""On-demand profiling of the running bot (behind !profile).
+
+A session runs for a set number of seconds and then produces report
+files for the bot to attach to the channel:
+
+- cpu: cProfile over the event loop thread (pstats text plus a .prof
+  file for snakeviz / pstats)
+- sample: a background thread samples the loop thread's stack every few
+  milliseconds; cheaper than cProfile and shows where time is spent
+  including idle waits (collapsed stacks for flamegraph.pl / speedscope)
+- memory: tracemalloc snapshots at the start and end, diffed by line
+
+Every session also times each step of every asyncio task, so the slowest
+coroutines (the ones holding up the loop) are listed too.
+
+Nothing is installed until a session starts and everything is removed
+when it ends, so when no session is running the bot pays nothing.
+"""
+import asyncio
+import asyncio.events
+from collections import Counter, deque
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from typing import Dict, List, Optional, Tuple
+
+MODES = ('cpu', 'sample', 'memory')
+SAMPLE_INTERVAL = 0.005   # seconds between stack samples
+TRACE_FRAMES = 10         # traceback depth kept by tracemalloc
+REPORT_LINES = 40
+
+
+class _TaskTimer:
+    """Times every event loop callback by patching Handle._run while active.
+
+    Task steps are reported under their coroutine's name; other callbacks
+    (timers, futures' done callbacks) under the callback's name.
+    """
+
+    def __init__(self):
+        self.stats: Dict[str, List[float]] = {}  # name -> [steps, total, max]
+        self._original = None
+
+    def install(self):
+        original = self._original = asyncio.events.Handle._run
+        stats = self.stats
+        perf_counter = time.perf_counter
+
+        def _run(handle):
+            start = perf_counter()
+            try:
+                return original(handle)
+            finally:
+                elapsed = perf_counter() - start
+                name = _callback_name(handle._callback)
+                entry = stats.get(name)
+                if entry is None:
+                    stats[name] = [1, elapsed, elapsed]
+                else:
+                    entry[0] += 1
+                    entry[1] += elapsed
+                    if elapsed > entry[2]:
+                        entry[2] = elapsed
+
+        asyncio.events.Handle._run = _run
+
+    def uninstall(self):
+        if self._original is not None:
+            asyncio.events.Handle._run = self._original
+            self._original = None
+
+    def report(self, seconds: float) -> str:
+        lines = [f'Event loop callbacks over {seconds:.1f}s, slowest single step first',
+                 '',
+                 f'{"max ms":>9} {"total ms":>10} {"steps":>8} {"% loop":>7}  coroutine / callback']
+        ranked = sorted(self.stats.items(), key=lambda item: item[1][2], reverse=True)
+        for name, (steps, total, worst) in ranked[:REPORT_LINES * 2]:
+            lines.append(f'{worst * 1e3:9.2f} {total * 1e3:10.1f} {int(steps):8d} '
+                         f'{total / seconds:7.1%}  {name}')
+        return '\n'.join(lines) + '\n'
+
+
+def _callback_name(callback) -> str:
+    task = getattr(callback, '__self__', None)
+    if isinstance(task, asyncio.Task):
+        coro = task.get_coro()
+        return f'{getattr(coro, "__qualname__", coro)} [task]'
+    return getattr(callback, '__qualname__', None) or repr(callback)
+
+
+class _Sampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+        self._switch_interval = sys.getswitchinterval()
+
+    def start(self):
+        # The sampler only sees the loop thread where it gives up the GIL.
+        # A short switch interval keeps short callbacks from hiding behind
+        # the select() they return to.
+        sys.setswitchinterval(min(self._switch_interval, self.interval / 20))
+        super().start()
+
+    def run(self):
+        labels: Dict[types.CodeType, str] = {}
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = (f'{code.co_name} '
+                                            f'({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                stack.append(label)
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def report(self, seconds: float) -> Dict[str, bytes]:
+        """Top functions by own and total samples, plus collapsed stacks."""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for label in set(frames):
+                total[label] += count
+        n = self.samples or 1
+        lines = [f'{self.samples:,} samples every {self.interval * 1e3:g}ms over {seconds:.1f}s', '',
+                 'Own time (where the loop thread was when sampled):']
+        lines += [f'{count / n:7.1%}  {label}' for label, count in own.most_common(REPORT_LINES)]
+        lines += ['', 'Total time (function anywhere on the stack):']
+        lines += [f'{count / n:7.1%}  {label}' for label, count in total.most_common(REPORT_LINES)]
+        collapsed = '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common())
+        return {'sample.txt': ('\n'.join(lines) + '\n').encode(),
+                'sample.collapsed': (collapsed + '\n').encode()}
+
+
+class Profiler:
+    """One profiling session at a time; `start`, then `stop` for the reports."""
+
+    def __init__(self):
+        self.mode: Optional[str] = None
+        self.started = 0.0
+        self._done: Optional[asyncio.Event] = None
+        self._timer: Optional[_TaskTimer] = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_Sampler] = None
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._started_tracing = False
+
+    @property
+    def active(self) -> bool:
+        return self.mode is not None
+
+    def start(self, mode: str, interval: float = SAMPLE_INTERVAL):
+        """Begin a session; must be called from the event loop thread."""
+        if self.active:
+            raise RuntimeError(f'a {self.mode} session is already running')
+        if mode not in MODES:
+            raise ValueError(f'mode must be one of {", ".join(MODES)}')
+        self.mode = mode
+        self.started = time.perf_counter()
+        self._done = asyncio.Event()
+        self._timer = _TaskTimer()
+        self._timer.install()
+        if mode == 'cpu':
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif mode == 'sample':
+            self._sampler = _Sampler(threading.get_ident(), interval)
+            self._sampler.start()
+        else:
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start(TRACE_FRAMES)
+            self._snapshot = tracemalloc.take_snapshot()
+
+    async def run_for(self, seconds: float) -> bool:
+        """Wait out the session; False if `cancel` ended it early."""
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout=seconds)
+            return False
+        except asyncio.TimeoutError:
+            return True
+
+    def cancel(self) -> bool:
+        """End the running session early (its owner still collects the reports)."""
+        if not self.active:
+            return False
+        self._done.set()
+        return True
+
+    def stop(self) -> Dict[str, bytes]:
+        """End the session, remove every hook and return report files by name."""
+        if not self.active:
+            return {}
+        seconds = time.perf_counter() - self.started
+        files: Dict[str, bytes] = {}
+        try:
+            if self._profile is not None:
+                self._profile.disable()
+                files.update(_cprofile_report(self._profile))
+            if self._sampler is not None:
+                self._sampler.stop()
+                files.update(self._sampler.report(seconds))
+            if self._snapshot is not None:
+                files['memory.txt'] = _memory_report(self._snapshot, tracemalloc.take_snapshot(), seconds)
+        finally:
+            if self._started_tracing:
+                tracemalloc.stop()
+            self._timer.uninstall()
+            files['coroutines.txt'] = self._timer.report(seconds).encode()
+            self.mode = None
+            self._timer = self._profile = self._sampler = self._snapshot = None
+            self._started_tracing = False
+        return files
+
+
+def _cprofile_report(profile: cProfile.Profile) -> Dict[str, bytes]:
+    text = io.StringIO()
+    stats = pstats.Stats(profile, stream=text)
+    stats.sort_stats('cumulative').print_stats(REPORT_LINES)
+    stats.sort_stats('tottime').print_stats(REPORT_LINES)
+    profile.create_stats()
+    return {'cpu.txt': text.getvalue().encode(), 'cpu.prof': marshal.dumps(profile.stats)}
+
+
+def _memory_report(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, seconds: float) -> bytes:
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__),
+              tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+              tracemalloc.Filter(False, __file__)]
+    before, after = before.filter_traces(ignore), after.filter_traces(ignore)
+    traced = sum(stat.size for stat in after.statistics('filename'))
+    lines = [f'Python allocations traced: {traced / 2**20:.1f} MiB; growth over {seconds:.1f}s by line:', '']
+    for stat in after.compare_to(before, 'lineno')[:REPORT_LINES]:
+        lines.append(str(stat))
+    lines += ['', 'Largest growth with tracebacks:']
+    for stat in after.compare_to(before, 'traceback')[:5]:
+        lines.append('')
+        lines.append(f'{stat.size_diff / 1024:+.1f} KiB, {stat.count_diff:+d} blocks')
+        lines += stat.traceback.format(limit=TRACE_FRAMES)
+    return ('\n'.join(lines) + '\n').encode()
+
+
+# ============================================================================
+# CACHE SIZES
+# ============================================================================
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_CONTAINERS = (dict, list, tuple, set, frozenset, deque)
+_OPAQUE = (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType)
+
+
+def _own_class(obj) -> bool:
+    """Objects from the bot's own modules are followed; library objects
+    (discord models, sessions, tasks) are counted shallowly."""
+    module = sys.modules.get(type(obj).__module__)
+    path = getattr(module, '__file__', None)
+    return path is not None and os.path.dirname(os.path.abspath(path)) == _HERE
+
+
+def deep_sizeof(obj, seen: Optional[set] = None) -> int:
+    """Approximate bytes held by `obj`, following containers and the bot's own objects."""
+    seen = set() if seen is None else seen
+    pending = [obj]
+    size = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, _OPAQUE):
+            continue
+        seen.add(id(obj))
+        nbytes = getattr(obj, 'nbytes', None)  # numpy arrays: count the data, even for views
+        size += nbytes if isinstance(nbytes, int) and hasattr(obj, 'dtype') else sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, _CONTAINERS):
+            pending.extend(obj)
+        elif _own_class(obj):
+            if hasattr(obj, '__dict__'):
+                pending.append(vars(obj))
+            for cls in type(obj).__mro__:
+                for name in getattr(cls, '__slots__', ()):
+                    value = getattr(obj, name, None)
+                    if value is not None:
+                        pending.append(value)
+    return size
+
+
+def cache_report(caches: Dict[str, object]) -> List[Tuple[str, Optional[int], int]]:
+    """(name, items, bytes) for each cache, largest first."""
+    seen: set = set()
+    rows = []
+    for name, cache in caches.items():
+        items = len(cache) if hasattr(cache, '__len__') else None
+        rows.append((name, items, deep_sizeof(cache, seen)))
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows
+
+
+def format_cache_report(rows: List[Tuple[str, Optional[int], int]]) -> str:
+    lines = [f'{"bytes":>12} {"items":>9}  cache']
+    for name, items, size in rows:
+        lines.append(f'{size:12,d} {items if items is not None else "-":>9}  {name}')
+    return '\n'.join(lines) + '\n'
+
+
+def task_dump() -> str:
+    """Every pending task on the running loop with its current stack."""
+    out = io.StringIO()
+    tasks = sorted(asyncio.all_tasks(), key=lambda t: t.get_name())
+    out.write(f'{len(tasks)} pending task(s)\n')
+    for task in tasks:
+        coro = task.get_coro()
+        out.write(f'\n{task.get_name()}: {getattr(coro, "__qualname__", coro)}\n')
+        task.print_stack(limit=8, file=out)
+    return out.getvalue()
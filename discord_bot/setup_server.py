@@ -23,8 +23,6 @@ SITE = "https://pandaudit.com"
 INVITE = "https://discord.gg/6WmytaGJam"
 
 TOKEN = os.environ.get("DISCORD_BOT_TOKEN")
-if not TOKEN:
-    sys.exit("Set DISCORD_BOT_TOKEN in the environment.")
 
 S = requests.Session()
 S.headers.update({"Authorization": f"Bot {TOKEN}", "Content-Type": "application/json"})
@@ -97,6 +95,8 @@ If you haven't tried yet, the walkthrough is at {SITE}/tutorials/""",
 
 
 def main():
+    if not TOKEN:
+        sys.exit("Set DISCORD_BOT_TOKEN in the environment.")
     me = call("GET", "/users/@me")
     print(f"Authenticated as bot: {me['username']}")
 
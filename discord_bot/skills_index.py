@@ -0,0 +1,159 @@
+"""Typo-tolerant lookup over the skills library (_skills/*.md).
+
+Every skill's name, title, description and category are broken into
+character trigrams and stored in an inverted index, built once and
+rebuilt only when a skill file is added, removed or edited. A query
+scores candidates by shared trigrams, so "reconcilation" or "nested if"
+still find the right skill.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+import math
+import os
+from pathlib import Path
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# How much a trigram hit in each front-matter field counts towards the score
+FIELD_WEIGHTS = {'name': 3.0, 'title': 3.0, 'category': 1.5, 'description': 1.0}
+RECHECK_SECONDS = 5.0
+MIN_SCORE = 0.3
+
+
+@dataclass
+class Skill:
+    name: str
+    title: str
+    description: str
+    category: str
+    inputs: List[str] = field(default_factory=list)
+
+
+def _front_matter(text: str) -> Tuple[Dict[str, str], str]:
+    """Flat `key: value` front matter (all the skills use) and the body."""
+    if not text.startswith('---'):
+        return {}, text
+    parts = text.split('---', 2)
+    if len(parts) < 3:
+        return {}, text
+    meta = {}
+    for line in parts[1].splitlines():
+        key, sep, value = line.partition(':')
+        if sep and key.strip() and not key.startswith(' '):
+            meta[key.strip()] = value.strip().strip('"\'')
+    return meta, parts[2]
+
+
+def _inputs(body: str) -> List[str]:
+    """Bullets under the '## Inputs it expects' heading, markdown stripped."""
+    match = re.search(r'^## Inputs it expects\s*$(.*?)(?=^## |\Z)', body, re.M | re.S)
+    if not match:
+        return []
+    bullets = re.findall(r'^- (.+)$', match.group(1), re.M)
+    return [re.sub(r'[*`]', '', b).strip() for b in bullets]
+
+
+def load_skill(path: Path) -> Skill:
+    meta, body = _front_matter(path.read_text(encoding='utf-8'))
+    return Skill(
+        name=meta.get('name', path.stem),
+        title=meta.get('title', path.stem),
+        description=meta.get('description', ''),
+        category=meta.get('category', ''),
+        inputs=_inputs(body),
+    )
+
+
+def trigrams(text: str) -> set:
+    grams = set()
+    for word in re.findall(r'[a-z0-9]+', text.lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SkillIndex:
+    """Inverted trigram index, reloaded automatically when _skills/ changes."""
+
+    def __init__(self, skills_dir):
+        self.skills_dir = Path(skills_dir)
+        self.skills: List[Skill] = []
+        self.by_name: Dict[str, int] = {}
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.norms = np.zeros(0)
+        self._signature = None
+        self._checked_at = 0.0
+
+    def _current_signature(self):
+        try:
+            with os.scandir(self.skills_dir) as it:
+                return tuple(sorted((e.name, e.stat().st_mtime_ns)
+                                    for e in it if e.name.endswith('.md')))
+        except FileNotFoundError:
+            return ()
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rebuild if any skill file changed. Cheap: one directory scan at most
+        every RECHECK_SECONDS."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < RECHECK_SECONDS:
+            return False
+        self._checked_at = now
+        signature = self._current_signature()
+        if signature == self._signature:
+            return False
+        self._build(sorted(self.skills_dir.glob('*.md')))
+        self._signature = signature
+        return True
+
+    def _build(self, paths):
+        skills, postings, norms = [], defaultdict(lambda: ([], [])), []
+        for doc_id, path in enumerate(paths):
+            skill = load_skill(path)
+            skills.append(skill)
+            weights = defaultdict(float)
+            for field_name, weight in FIELD_WEIGHTS.items():
+                for gram in trigrams(getattr(skill, field_name)):
+                    weights[gram] = max(weights[gram], weight)
+            for gram, weight in weights.items():
+                docs, ws = postings[gram]
+                docs.append(doc_id)
+                ws.append(weight)
+            norms.append(math.sqrt(sum(w * w for w in weights.values())) or 1.0)
+
+        # Swap in the finished index in one step; lookups never see half of it
+        self.skills = skills
+        self.by_name = {s.name.lower(): i for i, s in enumerate(skills)}
+        self.postings = {gram: (np.array(docs, dtype=np.int32), np.array(ws, dtype=np.float32))
+                         for gram, (docs, ws) in postings.items()}
+        self.norms = np.array(norms)
+
+    def search(self, query: str, limit: int = 3) -> List[Tuple[Skill, float]]:
+        """Best matches for a free-text query, highest score first."""
+        self.refresh()
+        exact = self.by_name.get(query.strip().lower().replace(' ', '-'))
+        if exact is not None:
+            return [(self.skills[exact], 1.0)]
+
+        grams = trigrams(query)
+        hits = [self.postings[g] for g in grams if g in self.postings]
+        if not hits:
+            return []
+        # Share of the query's trigrams found in the skill, weighted by the
+        # field they were found in: one bincount over the matching postings
+        scores = np.bincount(np.concatenate([docs for docs, _ in hits]),
+                             weights=np.concatenate([ws for _, ws in hits]),
+                             minlength=len(self.skills))
+        scores /= len(grams) * max(FIELD_WEIGHTS.values())
+        top = np.argpartition(-scores, min(limit, len(scores) - 1))[:limit]
+        # Highest score first; shorter skills win ties
+        top = sorted(top, key=lambda d: (-scores[d], self.norms[d]))
+        return [(self.skills[d], float(scores[d])) for d in top if scores[d] >= MIN_SCORE]
+
+    def get(self, name: str) -> Optional[Skill]:
+        self.refresh()
+        idx = self.by_name.get(name.lower())
+        return self.skills[idx] if idx is not None else None
@@ -0,0 +1,197 @@
+"""Coalesced welcome messages for member joins.
+
+Joins are queued per guild and welcomed together: the first join opens a
+short window, and everyone who joins before it closes gets one shared
+message. While joins keep coming the window doubles, up to a minute, so a
+burst of N joins costs a handful of messages instead of N. At raid rates
+the window goes straight to the maximum and the welcome turns into a short
+summary without mentions.
+
+The welcome channel is resolved once per guild and cached; the bot drops
+the cache entry when that guild's channels change.
+
+Run this file to benchmark messages sent per burst against the old
+one-embed-per-join behaviour.
+"""
+import asyncio
+from collections import deque
+import logging
+import time
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Sequence
+
+import discord
+
+logger = logging.getLogger('pandaudit_bot')
+
+
+class WelcomeBatcher:
+    """Queues joins per guild and sends one welcome per window."""
+
+    def __init__(self, build_embed: Callable[[List, bool], discord.Embed],
+                 channel_names: Sequence[str], batch_seconds: float = 3.0,
+                 max_batch_seconds: float = 60.0, raid_joins: int = 20,
+                 raid_window: float = 10.0,
+                 send: Optional[Callable[..., Awaitable]] = None):
+        self.build_embed = build_embed  # (members, raid) -> Embed
+        self.send = send or (lambda channel, embed: channel.send(embed=embed))
+        self.channel_names = list(channel_names)
+        self.batch_seconds = batch_seconds
+        self.max_batch_seconds = max_batch_seconds
+        self.raid_joins = raid_joins
+        self.raid_window = raid_window
+        self.channel_ids: Dict[int, Optional[int]] = {}
+        self.pending: Dict[int, List] = {}
+        self.recent: Dict[int, Deque[float]] = {}
+        self.raiding: Dict[int, bool] = {}
+        self.tasks: Dict[int, asyncio.Task] = {}
+
+    def channel_for(self, guild):
+        """The guild's welcome channel, looked up by name only on a cache miss."""
+        if guild.id in self.channel_ids:
+            channel_id = self.channel_ids[guild.id]
+            channel = guild.get_channel(channel_id) if channel_id else None
+            if channel is not None or channel_id is None:
+                return channel
+        channel = None
+        for name in self.channel_names:
+            channel = discord.utils.get(guild.text_channels, name=name)
+            if channel:
+                break
+        self.channel_ids[guild.id] = channel.id if channel else None
+        return channel
+
+    def forget(self, guild_id: int):
+        """Drop the cached channel, e.g. after a channel was renamed."""
+        self.channel_ids.pop(guild_id, None)
+
+    def _join_rate(self, guild_id: int, now: float) -> int:
+        """Joins in the last raid_window seconds."""
+        recent = self.recent.setdefault(guild_id, deque())
+        while recent and now - recent[0] > self.raid_window:
+            recent.popleft()
+        return len(recent)
+
+    def add(self, member):
+        """Queue a join; the welcome goes out when the guild's window closes."""
+        guild = member.guild
+        now = time.monotonic()
+        self.recent.setdefault(guild.id, deque()).append(now)
+        if not self.raiding.get(guild.id) and self._join_rate(guild.id, now) >= self.raid_joins:
+            self.raiding[guild.id] = True
+            logger.warning(f'Join burst in {guild.name}: {self.raid_joins}+ joins in '
+                           f'{self.raid_window:.0f}s, welcoming in batches every '
+                           f'{self.max_batch_seconds:.0f}s')
+        self.pending.setdefault(guild.id, []).append(member)
+        if guild.id not in self.tasks:
+            self.tasks[guild.id] = asyncio.create_task(self._drain(guild))
+
+    async def _drain(self, guild):
+        """Send one welcome per window until a window passes with no joins.
+
+        Each busy window doubles the next one, so a steady stream of joins
+        settles at one message per max_batch_seconds.
+        """
+        delay = self.batch_seconds
+        try:
+            while True:
+                if self.raiding.get(guild.id):
+                    delay = self.max_batch_seconds
+                await asyncio.sleep(delay)
+                members = self.pending.pop(guild.id, [])
+                if not members:
+                    # A whole window with no joins: any burst is over, so the
+                    # next lone join gets a normal welcome
+                    if self.raiding.pop(guild.id, False):
+                        logger.info(f'Join burst in {guild.name} is over')
+                    break
+                raid = self.raiding.get(guild.id, False)
+                # Leave raid mode only once the rate is well below the trigger,
+                # so a rate hovering at the threshold doesn't flap
+                if raid and self._join_rate(guild.id, time.monotonic()) < self.raid_joins // 2:
+                    self.raiding[guild.id] = False
+                    logger.info(f'Join burst in {guild.name} is over')
+                await self._send(guild, members, raid)
+                delay = min(delay * 2, self.max_batch_seconds)
+        finally:
+            self.tasks.pop(guild.id, None)
+
+    async def _send(self, guild, members: List, raid: bool):
+        channel = self.channel_for(guild)
+        if channel is None:
+            return
+        try:
+            await self.send(channel, self.build_embed(members, raid))
+        except discord.HTTPException as e:
+            logger.error(f'Failed to welcome {len(members)} member(s) in {guild.name}: {e}')
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+class _FakeChannel:
+    def __init__(self, name):
+        self.id = hash(name) & 0xFFFF
+        self.name = name
+        self.sent = 0
+
+    async def send(self, embed=None):
+        self.sent += 1
+
+
+class _FakeGuild:
+    def __init__(self, lookups: List[int]):
+        self.id = 1
+        self.name = 'bench'
+        self.channel = _FakeChannel('welcome')
+        self._channels = [_FakeChannel(f'chan-{i}') for i in range(200)] + [self.channel]
+        self.lookups = lookups
+
+    @property
+    def text_channels(self):
+        self.lookups[0] += 1
+        return self._channels
+
+    def get_channel(self, channel_id):
+        return self.channel if channel_id == self.channel.id else None
+
+
+class _FakeMember:
+    def __init__(self, guild, i):
+        self.guild = guild
+        self.mention = f'<@{i}>'
+
+
+async def _run_scenario(joins: int, seconds: float, scale: float):
+    lookups = [0]
+    guild = _FakeGuild(lookups)
+    batcher = WelcomeBatcher(lambda members, raid: None, ['welcome', 'general'],
+                             batch_seconds=3.0 * scale, max_batch_seconds=60.0 * scale,
+                             raid_window=10.0 * scale)
+    gap = seconds * scale / joins
+    for i in range(joins):
+        batcher.add(_FakeMember(guild, i))
+        await asyncio.sleep(gap)
+    while batcher.tasks:
+        await asyncio.sleep(scale)
+    return guild.channel.sent, lookups[0]
+
+
+def _benchmark(scale: float = 0.01):
+    logger.setLevel(logging.ERROR)
+    # (name, joins, seconds over which they arrive), in real-world seconds;
+    # the run is compressed by `scale`
+    scenarios = [
+        ('trickle: 20 joins, one every 10s', 20, 200.0),
+        ('promotion: 300 joins over 5 min', 300, 300.0),
+        ('raid: 2000 joins over 2 min', 2000, 120.0),
+    ]
+    print(f"{'scenario':<36} {'joins':>6} {'old msgs':>9} {'new msgs':>9} {'channel scans':>14}")
+    for name, joins, seconds in scenarios:
+        sent, lookups = asyncio.run(_run_scenario(joins, seconds, scale))
+        # The old handler sent one embed and scanned text_channels once per join
+        print(f'{name:<36} {joins:>6} {joins:>9} {sent:>9} {f"{joins} -> {lookups}":>14}')
+
+
+if __name__ == '__main__':
+    _benchmark()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Announce new blog posts to Discord.
+
+Finds every post added in a commit range, builds its URL with the same
+logic the site uses (see verify_post_urls.expected_url_for_post), and sends
+the announcements as webhook embeds, up to 10 per request.
+
+A small JSON ledger records what has already been announced, so re-running
+the same range (or a retried workflow) never posts duplicates.
+
+Usage:
+    DISCORD_WEBHOOK_URL=... python3 notify_discord.py BASE_SHA HEAD_SHA
+    python3 notify_discord.py HEAD^ HEAD --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import requests
+import yaml
+
+from verify_post_urls import (
+    POST_FILE_PATTERN,
+    expected_url_for_post,
+    read_yaml_front_matter,
+)
+
+
+MAX_EMBEDS_PER_MESSAGE = 10
+EMBED_COLOR = 5814783
+TITLE_LIMIT = 256
+DESCRIPTION_LIMIT = 4096
+DEFAULT_LEDGER = ".discord_announced.json"
+
+
+def new_posts(repo_root: Path, base: str, head: str) -> List[Path]:
+    """Posts added (not just edited) between two commits, oldest first."""
+    out = subprocess.run(
+        ["git", "diff", "--name-only", "--diff-filter=A", base, head, "--", "_posts/"],
+        cwd=repo_root,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    posts = []
+    for line in out.splitlines():
+        path = repo_root / line.strip()
+        if POST_FILE_PATTERN.match(path.name) and path.exists():
+            posts.append(path)
+    return sorted(posts)
+
+
+def truncate(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[: limit - 1].rstrip() + "…"
+
+
+def build_embed(post_path: Path, config: Dict) -> Optional[Dict]:
+    front_matter = read_yaml_front_matter(post_path)
+    if front_matter.get("published") is False:
+        return None
+    title = front_matter.get("title") or post_path.stem
+    description = front_matter.get("excerpt") or front_matter.get("subtitle") or ""
+    return {
+        "title": truncate(f"New Blog Post: {title}", TITLE_LIMIT),
+        "description": truncate(description, DESCRIPTION_LIMIT),
+        "url": expected_url_for_post(post_path, config),
+        "color": EMBED_COLOR,
+        "footer": {"text": "Click to read and discuss!"},
+    }
+
+
+def load_ledger(path: Path) -> Dict[str, str]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_ledger(path: Path, ledger: Dict[str, str]) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(ledger, indent=2, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
+
+
+def post_webhook(session: requests.Session, webhook_url: str, embeds: List[Dict],
+                 max_attempts: int = 5) -> None:
+    """Send one webhook message, waiting out Discord rate limits."""
+    for _ in range(max_attempts):
+        r = session.post(webhook_url, params={"wait": "true"}, json={"embeds": embeds}, timeout=30)
+        if r.status_code == 429:
+            retry_after = r.json().get("retry_after") if r.text else None
+            time.sleep(float(retry_after or r.headers.get("Retry-After", 2)) + 0.25)
+            continue
+        r.raise_for_status()
+        # Out of budget for this bucket: wait before the next batch goes out
+        if r.headers.get("X-RateLimit-Remaining") == "0":
+            time.sleep(float(r.headers.get("X-RateLimit-Reset-After", 1)))
+        return
+    raise RuntimeError(f"Webhook still rate limited after {max_attempts} attempts")
+
+
+def announce(posts: List[Path], config: Dict, webhook_url: Optional[str], ledger_path: Path,
+             dry_run: bool = False) -> int:
+    ledger = load_ledger(ledger_path)
+    pending = []
+    for post in posts:
+        embed = build_embed(post, config)
+        if embed is None:
+            print(f"skip (unpublished): {post.name}")
+        elif embed["url"] in ledger:
+            print(f"skip (already announced): {post.name}")
+        else:
+            pending.append(embed)
+
+    if not pending:
+        print("Nothing new to announce.")
+        return 0
+
+    session = requests.Session()
+    for i in range(0, len(pending), MAX_EMBEDS_PER_MESSAGE):
+        batch = pending[i:i + MAX_EMBEDS_PER_MESSAGE]
+        if dry_run:
+            print(json.dumps({"embeds": batch}, indent=2))
+            continue
+        post_webhook(session, webhook_url, batch)
+        # Record each batch as soon as it is delivered, so a failure part way
+        # through never re-announces the batches that already went out
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        ledger.update({embed["url"]: stamp for embed in batch})
+        save_ledger(ledger_path, ledger)
+        print(f"Announced {len(batch)} post(s)")
+    return len(pending)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base", help="commit before the push (e.g. github.event.before)")
+    parser.add_argument("head", nargs="?", default="HEAD", help="last commit of the push")
+    parser.add_argument("--ledger", default=DEFAULT_LEDGER, help="JSON file of announced URLs")
+    parser.add_argument("--dry-run", action="store_true", help="print the payloads instead of sending")
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).resolve().parent
+    config = yaml.safe_load((repo_root / "_config.yml").read_text(encoding="utf-8")) or {}
+    webhook_url = os.environ.get("DISCORD_WEBHOOK_URL")
+    if not webhook_url and not args.dry_run:
+        print("Set DISCORD_WEBHOOK_URL in the environment (or use --dry-run).")
+        return 1
+
+    posts = new_posts(repo_root, args.base, args.head)
+    print(f"Found {len(posts)} new post(s) in {args.base}..{args.head}")
+    announce(posts, config, webhook_url, repo_root / args.ledger, dry_run=args.dry_run)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
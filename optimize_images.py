@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Build resized WebP/AVIF/PNG variants of the site's images.
+
+For every image under assets/ that a rendered page shows through
+_includes/responsive-image.html, this writes variants at standard widths
+to assets/img/optimized/ and records them in _data/images.json, which the
+include turns into a <picture> with srcset. Pages, layouts and includes
+are resolved the way Jekyll renders them (check_links.rendered_templates),
+so an image only used by an unused template gets no variants.
+
+Variants are keyed by a hash of the source file's bytes: an image that
+hasn't changed since the last run is skipped, and variants of older
+versions are removed. Images are processed in parallel, one per worker.
+
+Usage:
+    python3 optimize_images.py            # build variants, update manifest, report savings
+    python3 optimize_images.py --report   # report only, using the existing manifest
+
+Needs Pillow and PyYAML; AVIF is only written when Pillow was built with
+AVIF support. Commit assets/img/optimized/ and _data/images.json after a
+run so GitHub Pages serves the variants; CI reruns this and fails when
+they are out of date.
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import hashlib
+import json
+from pathlib import Path
+import re
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, features
+import yaml
+
+from check_links import build_url_index, rendered_pages, rendered_templates
+
+
+WIDTHS = (320, 640, 1024, 1600)
+SOURCE_GLOBS = ("assets/img/*.png", "assets/img/*.jpg", "assets/img/*.jpeg",
+                "assets/*.png", "assets/*.jpg", "assets/*.jpeg")
+OUT_DIR = Path("assets/img/optimized")
+MANIFEST = Path("_data/images.json")
+
+WEBP_QUALITY = 80
+AVIF_QUALITY = 55
+JPEG_QUALITY = 85
+
+
+@dataclass
+class Variant:
+    fmt: str
+    width: int
+    path: str
+    size: int
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:12]
+
+
+def site_path(path: Path) -> str:
+    return "/" + path.as_posix()
+
+
+def slug(path: Path) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", path.stem.lower()).strip("-")
+
+
+def target_widths(width: int) -> List[int]:
+    widths = [w for w in WIDTHS if w < width]
+    return widths + [min(width, WIDTHS[-1])]
+
+
+def output_formats(source_suffix: str) -> List[str]:
+    fmts = ["avif"] if features.check("avif") else []
+    fmts.append("webp")
+    # The fallback keeps the source's family: optimized PNG, or progressive JPEG
+    fmts.append("jpeg" if source_suffix in (".jpg", ".jpeg") else "png")
+    return fmts
+
+
+def build_variants(repo_root: Path, rel_source: str, digest: str) -> Dict:
+    """Worker: resize one image to every width and format."""
+    source = repo_root / rel_source
+    out_dir = repo_root / OUT_DIR
+    with Image.open(source) as img:
+        img.load()
+        width, height = img.size
+        has_alpha = img.mode in ("RGBA", "LA") or "transparency" in img.info
+        base = img.convert("RGBA" if has_alpha else "RGB")
+
+    variants: List[Variant] = []
+    for w in target_widths(width):
+        resized = base if w == width else base.resize((w, round(height * w / width)), Image.LANCZOS)
+        for fmt in output_formats(source.suffix.lower()):
+            ext = "jpg" if fmt == "jpeg" else fmt
+            out = out_dir / f"{slug(source)}-{digest}-{w}.{ext}"
+            if fmt == "avif":
+                resized.save(out, "AVIF", quality=AVIF_QUALITY)
+            elif fmt == "webp":
+                resized.save(out, "WEBP", quality=WEBP_QUALITY, method=6)
+            elif fmt == "jpeg":
+                resized.convert("RGB").save(out, "JPEG", quality=JPEG_QUALITY,
+                                            optimize=True, progressive=True)
+            else:
+                resized.save(out, "PNG", optimize=True)
+            variants.append(Variant(fmt, w, site_path(out.relative_to(repo_root)), out.stat().st_size))
+
+    return manifest_entry(digest, width, height, source.stat().st_size, variants)
+
+
+def manifest_entry(digest: str, width: int, height: int, original_bytes: int,
+                   variants: List[Variant]) -> Dict:
+    """Manifest record with ready-made srcset strings for the Liquid include."""
+    entry = {"hash": digest, "width": width, "height": height,
+             "bytes": original_bytes, "variants": [v.__dict__ for v in variants]}
+    for fmt in {v.fmt for v in variants}:
+        of_fmt = sorted((v for v in variants if v.fmt == fmt), key=lambda v: v.width)
+        entry[fmt] = ", ".join(f"{v.path} {v.width}w" for v in of_fmt)
+        entry[f"{fmt}_bytes"] = of_fmt[-1].size
+        if fmt in ("png", "jpeg"):
+            entry["fallback"] = of_fmt[-1].path
+    return entry
+
+
+def load_config(repo_root: Path) -> Dict:
+    return yaml.safe_load((repo_root / "_config.yml").read_text(encoding="utf-8")) or {}
+
+
+def load_manifest(repo_root: Path) -> Dict[str, Dict]:
+    path = repo_root / MANIFEST
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+
+def is_current(repo_root: Path, entry: Optional[Dict], digest: str) -> bool:
+    return bool(entry) and entry["hash"] == digest and all(
+        (repo_root / v["path"].lstrip("/")).exists() for v in entry["variants"])
+
+
+def build(repo_root: Path) -> Dict[str, Dict]:
+    (repo_root / OUT_DIR).mkdir(parents=True, exist_ok=True)
+    old = load_manifest(repo_root)
+    used = set().union(*rendered_images(repo_root, load_config(repo_root)).values())
+    sources = sorted(p for pattern in SOURCE_GLOBS for p in repo_root.glob(pattern)
+                     if site_path(p.relative_to(repo_root)) in used)
+
+    manifest: Dict[str, Dict] = {}
+    todo: List[Tuple[str, str]] = []
+    for source in sources:
+        key = site_path(source.relative_to(repo_root))
+        digest = file_hash(source)
+        if is_current(repo_root, old.get(key), digest):
+            manifest[key] = old[key]
+        else:
+            todo.append((key, digest))
+
+    print(f"{len(sources)} images rendered by pages, {len(sources) - len(todo)} unchanged, "
+          f"{len(todo)} to build")
+    started = time.perf_counter()
+    with ProcessPoolExecutor() as pool:
+        futures = {key: pool.submit(build_variants, repo_root, key.lstrip("/"), digest)
+                   for key, digest in todo}
+        for key, future in futures.items():
+            manifest[key] = future.result()
+            print(f"  built {key}")
+    if todo:
+        print(f"Built {len(todo)} image(s) in {time.perf_counter() - started:.1f}s")
+
+    # Variants of images that changed or disappeared are stale now
+    keep = {v["path"] for entry in manifest.values() for v in entry["variants"]}
+    for stale in (repo_root / OUT_DIR).iterdir():
+        if site_path(stale.relative_to(repo_root)) not in keep:
+            stale.unlink()
+
+    (repo_root / MANIFEST).parent.mkdir(exist_ok=True)
+    (repo_root / MANIFEST).write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n",
+                                      encoding="utf-8")
+    return manifest
+
+
+def best_bytes(entry: Dict) -> int:
+    """What a modern browser downloads at full width: the smallest format."""
+    return min(entry[f"{fmt}_bytes"] for fmt in ("avif", "webp", "png", "jpeg")
+               if f"{fmt}_bytes" in entry)
+
+
+RESPONSIVE_INCLUDE = re.compile(r"\{%-?\s*include\s+responsive-image\.html\b(.*?)-?%\}", re.S)
+INCLUDE_SRC = re.compile(r"""\bsrc\s*=\s*(?:"([^"]*)"|'([^']*)'|site\.([\w-]+))""")
+
+
+def rendered_images(repo_root: Path, config: Dict) -> Dict[str, set]:
+    """Images each rendered page (by output URL) shows through
+    responsive-image.html, in its own source or any layout or include it is
+    rendered with. Images referenced any other way (plain <img>, favicons,
+    CSS) don't get the variants, so they aren't counted."""
+    found: Dict[Path, set] = {}
+
+    def direct(path: Path) -> set:
+        if path not in found:
+            keys = set()
+            for args in RESPONSIVE_INCLUDE.findall(path.read_text(encoding="utf-8", errors="ignore")):
+                match = INCLUDE_SRC.search(args)
+                if match:
+                    src = match.group(1) or match.group(2) or str(config.get(match.group(3)) or "")
+                    if src:
+                        keys.add("/" + src.lstrip("/"))
+            found[path] = keys
+        return found[path]
+
+    _, source_urls = build_url_index(repo_root, config)
+    return {url: set().union(*map(direct, rendered_templates(repo_root, rel_path, config)))
+            for url, rel_path in rendered_pages(repo_root, source_urls).items()}
+
+
+def report(repo_root: Path, manifest: Dict[str, Dict]) -> None:
+    rows = []
+    for url, keys in rendered_images(repo_root, load_config(repo_root)).items():
+        used = sorted(k for k in keys if k in manifest)
+        if used:
+            before = sum(manifest[k]["bytes"] for k in used)
+            after = sum(best_bytes(manifest[k]) for k in used)
+            rows.append((url, len(used), before, after))
+
+    def line(name: str, count: int, before: int, after: int) -> str:
+        pct = (1 - after / before) * 100 if before else 0.0
+        return f"{name:<60} {count:>3} {before / 1024:>10.1f} {after / 1024:>10.1f} {pct:>6.1f}%"
+
+    print(f"\n{'Page URL (images rendered via responsive-image.html)':<60} {'img':>3} "
+          f"{'KiB before':>10} {'KiB after':>10} {'saved':>7}")
+    print("-" * 95)
+    for row in rows:
+        print(line(*row))
+    total_before = sum(e["bytes"] for e in manifest.values())
+    total_after = sum(best_bytes(e) for e in manifest.values())
+    print("-" * 95)
+    print(line("All images with variants", len(manifest), total_before, total_after))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--report", action="store_true", help="only report, don't build")
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).resolve().parent
+    manifest = load_manifest(repo_root) if args.report else build(repo_root)
+    if not manifest:
+        print("No manifest yet — run without --report first.")
+        return 1
+    report(repo_root, manifest)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
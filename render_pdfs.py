@@ -0,0 +1,665 @@
+#!/usr/bin/env python3
+"""Render a printable PDF of every post, skill and root page from its markdown.
+
+Covers _posts/, archived_posts/, _skills/ and the root pages in PAGES
+(index.md, community.md). Posts are written to assets/pdf/<post>.pdf (the
+names the hand-made PDFs already use), skills to
+assets/pdf/skills/<name>.pdf and root pages to the PDF next to them
+(index.pdf, community.pdf). The root pages are mostly HTML landing-page
+markup; their headings, links and emphasis are turned into markdown and
+the rest of the layout (cards, buttons, the Discord widget) is dropped.
+A PDF already at its path that this script didn't render (it isn't in the
+manifest) is hand-made and is kept; --replace-handmade renders over it. Each PDF has the title, subtitle,
+date, tags and canonical URL, then the body: headings, paragraphs,
+lists, quotes, code blocks, tables (including pasted pandas HTML tables)
+and local images.
+
+Files are rendered in parallel, one per worker. A source is skipped when
+its content hash matches assets/pdf/manifest.json and its PDF exists; the
+hash also covers this script, so a layout change re-renders everything.
+Render time is reported per file.
+
+Usage:
+    python3 render_pdfs.py             # render new and changed sources
+    python3 render_pdfs.py --full      # render everything
+    python3 render_pdfs.py --replace-handmade   # also replace hand-made PDFs
+    python3 render_pdfs.py --report    # per-file times from the manifest, no rendering
+
+Needs reportlab and PyYAML (pip install -r requirements.txt). Uses DejaVu fonts when they're installed
+(most Linux systems) and the built-in PDF fonts otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime
+import hashlib
+import html
+from html.parser import HTMLParser
+import json
+from pathlib import Path
+import re
+import sys
+import time
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_LEFT
+    from reportlab.lib.pagesizes import LETTER
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.platypus import (HRFlowable, Image, KeepTogether, ListFlowable, ListItem,
+                                    Paragraph, Preformatted, SimpleDocTemplate, Spacer, Table,
+                                    TableStyle)
+except ImportError:
+    sys.exit("render_pdfs.py needs reportlab: pip install reportlab "
+             "(or pip install -r requirements.txt)")
+import yaml
+
+from check_links import page_url
+from verify_post_urls import (POST_FILE_PATTERN, expected_url_for_post, parse_filename,
+                              read_yaml_front_matter, slugify)
+
+
+SOURCES = (("_posts", ""), ("archived_posts", ""), ("_skills", "skills/"))
+PAGES = (("index.md", "index.pdf"), ("community.md", "community.pdf"))
+OUT_DIR = Path("assets/pdf")
+MANIFEST = OUT_DIR / "manifest.json"
+FONT_DIRS = ("/usr/share/fonts/truetype/dejavu", "/usr/share/fonts/dejavu",
+             "/Library/Fonts", "C:/Windows/Fonts")
+CODE_LINE_CHARS = 92     # code lines longer than this wrap
+ACCENT = colors.HexColor("#2f5f8f")
+CODE_BACKGROUND = colors.HexColor("#f4f5f7")
+RULE = colors.HexColor("#d0d4da")
+
+FRONT_MATTER = re.compile(r"\A---\s*\n.*?\n---\s*\n", re.S)
+LIQUID = re.compile(r"\{%-?\s*(?:raw|endraw)\s*-?%\}|\{%.*?%\}|\{\{.*?\}\}", re.S)
+HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+LIST_ITEM = re.compile(r"^(\s*)([-*+]|\d+[.)])\s+(.*)$")
+TABLE_DIVIDER = re.compile(r"^\s*\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?\s*$")
+IMAGE_LINE = re.compile(r"^\s*!\[([^\]]*)\]\(\s*<?([^)\s>]+)>?(?:\s+\"[^\"]*\")?\s*\)\s*$")
+HTML_IMAGE = re.compile(r"""<img\b[^>]*\bsrc\s*=\s*["']([^"']+)["'][^>]*>""", re.I)
+HR = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+LIQUID_URL = re.compile(r"""\{\{\s*(['"])(.*?)\1\s*\|\s*(?:relative_url|absolute_url)\s*\}\}""")
+LIQUID_SITE = re.compile(r"\{\{\s*site\.([\w.-]+)\s*\}\}")
+KRAMDOWN_ATTRIBUTES = re.compile(r"\{:[^}]*\}")
+HTML_HEADING = re.compile(r"<h([1-6])\b[^>]*>(.*?)</h\1>", re.S | re.I)
+HTML_LINK = re.compile(r"""<a\b[^>]*\bhref\s*=\s*["']([^"']*)["'][^>]*>(.*?)</a>""", re.S | re.I)
+HTML_BLOCK = re.compile(r"</?(?:div|section|p|header|footer|aside|figure)\b[^>]*>", re.I)
+
+
+@dataclass
+class Fonts:
+    body: str = "Helvetica"
+    bold: str = "Helvetica-Bold"
+    italic: str = "Helvetica-Oblique"
+    mono: str = "Courier"
+    unicode: bool = False
+
+
+def register_fonts() -> Fonts:
+    """DejaVu if available (covers arrows, box drawing, accents), else the
+    standard PDF fonts, for which text is folded to Latin-1."""
+    for directory in FONT_DIRS:
+        base = Path(directory)
+        files = {"PdfSans": "DejaVuSans.ttf", "PdfSans-Bold": "DejaVuSans-Bold.ttf",
+                 "PdfMono": "DejaVuSansMono.ttf"}
+        if all((base / f).exists() for f in files.values()):
+            for name, f in files.items():
+                pdfmetrics.registerFont(TTFont(name, str(base / f)))
+            oblique = base / "DejaVuSans-Oblique.ttf"
+            if oblique.exists():
+                pdfmetrics.registerFont(TTFont("PdfSans-Oblique", str(oblique)))
+            return Fonts("PdfSans", "PdfSans-Bold",
+                         "PdfSans-Oblique" if oblique.exists() else "PdfSans", "PdfMono", True)
+    return Fonts()
+
+
+LATIN1_FALLBACKS = {"→": "->", "←": "<-", "↑": "^", "▼": "v", "≤": "<=", "≥": ">=", "≠": "!=",
+                    "—": "--", "–": "-", "…": "...", "€": "EUR", "“": '"', "”": '"',
+                    "‘": "'", "’": "'", "•": "*", "█": "#", "─": "-", "│": "|"}
+
+
+def clean_text(text: str, fonts: Fonts) -> str:
+    """Drop emoji and other symbols no text font has; fold to Latin-1 for
+    the built-in fonts."""
+    out = []
+    for ch in text:
+        if ord(ch) >= 0x2190 and unicodedata.category(ch) == "So" and not 0x2500 <= ord(ch) < 0x25A0 \
+                and ch not in LATIN1_FALLBACKS:
+            continue  # emoji, pictographs
+        if ch in "\u200d\ufe0f\u20e3":
+            continue  # joiners and emoji presentation selectors
+        if not fonts.unicode and ord(ch) > 0xFF:
+            ch = LATIN1_FALLBACKS.get(ch, "+" if 0x2500 <= ord(ch) < 0x2580 else "?")
+        out.append(ch)
+    return "".join(out)
+
+
+def make_styles(fonts: Fonts) -> Dict[str, ParagraphStyle]:
+    body = ParagraphStyle("body", fontName=fonts.body, fontSize=10.5, leading=15,
+                          spaceAfter=7, alignment=TA_LEFT)
+    styles = {
+        "body": body,
+        "title": ParagraphStyle("title", body, fontName=fonts.bold, fontSize=22, leading=27,
+                                spaceAfter=6, textColor=colors.HexColor("#1b2a3a")),
+        "subtitle": ParagraphStyle("subtitle", body, fontName=fonts.italic, fontSize=13, leading=18,
+                                   textColor=colors.HexColor("#4a5568")),
+        "meta": ParagraphStyle("meta", body, fontSize=8.5, leading=12, textColor=colors.HexColor("#6b7280")),
+        "quote": ParagraphStyle("quote", body, fontName=fonts.italic, leftIndent=14,
+                                textColor=colors.HexColor("#4a5568")),
+        "code": ParagraphStyle("code", fontName=fonts.mono, fontSize=8, leading=10.5,
+                               backColor=CODE_BACKGROUND, borderPadding=6, leftIndent=6,
+                               rightIndent=6, spaceBefore=4, spaceAfter=12),
+        "cell": ParagraphStyle("cell", body, fontSize=8, leading=10, spaceAfter=0),
+        "caption": ParagraphStyle("caption", body, fontName=fonts.italic, fontSize=8.5,
+                                  textColor=colors.HexColor("#6b7280")),
+    }
+    for level, size in enumerate((17, 14.5, 12.5, 11, 10.5, 10.5), 1):
+        styles[f"h{level}"] = ParagraphStyle(f"h{level}", body, fontName=fonts.bold, fontSize=size,
+                                             leading=size * 1.3, spaceBefore=10 if level > 1 else 14,
+                                             spaceAfter=5, textColor=ACCENT if level <= 2 else colors.black)
+    return styles
+
+
+# ============================================================================
+# MARKDOWN
+# ============================================================================
+
+def inline(text: str, fonts: Fonts, site_url: str) -> str:
+    """Markdown inline syntax to reportlab paragraph markup."""
+    parts = re.split(r"(`+)(.+?)\1", clean_text(text, fonts))
+    out = []
+    # re.split with two groups yields text, fence, code, text, ...
+    for i in range(0, len(parts), 3):
+        chunk = escape(parts[i])
+        chunk = re.sub(r"!\[([^\]]*)\]\([^)]*\)", r"[\1]", chunk)
+
+        def link(match: re.Match) -> str:
+            href = match.group(2).strip()
+            if href.startswith("/"):
+                href = site_url + href
+            return f'<link href="{href}" color="#2f5f8f">{match.group(1)}</link>'
+
+        chunk = re.sub(r"\[([^\]]+)\]\(\s*<?([^)\s>]+)>?(?:\s+&quot;[^)]*)?\)", link, chunk)
+        chunk = re.sub(r"\*\*(.+?)\*\*|__(.+?)__", lambda m: f"<b>{m.group(1) or m.group(2)}</b>", chunk)
+        chunk = re.sub(r"(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])|(?<!\w)_(?!\s)(.+?)(?<!\s)_(?!\w)",
+                       lambda m: f"<i>{m.group(1) or m.group(2)}</i>", chunk)
+        chunk = re.sub(r"~~(.+?)~~", r"<strike>\1</strike>", chunk)
+        chunk = re.sub(r"<(?!/?(?:b|i|strike|link|font)\b)[^>]*>", "", chunk)
+        out.append(chunk)
+        if i + 2 < len(parts):
+            out.append(f'<font face="{fonts.mono}" backColor="#f0f1f3">{escape(parts[i + 2])}</font>')
+    return "".join(out)
+
+
+class _HtmlTable(HTMLParser):
+    """Rows of cell text from an HTML table (pandas' to_html output in old posts)."""
+
+    def __init__(self):
+        super().__init__()
+        self.rows: List[List[str]] = []
+        self._cell: Optional[List[str]] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self.rows.append([])
+        elif tag in ("td", "th"):
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._cell is not None and self.rows:
+            self.rows[-1].append(" ".join("".join(self._cell).split()))
+            self._cell = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+def split_row(line: str) -> List[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [cell.strip() for cell in re.split(r"(?<!\\)\|", line)]
+
+
+def page_markdown(text: str, config: Dict) -> str:
+    """Markdown from a root page's HTML layout: resolve the Liquid its links
+    use, keep headings, links and emphasis, drop widgets and block wrappers."""
+    def site_value(match: re.Match) -> str:
+        value = config
+        for key in match.group(1).split("."):
+            value = value.get(key, "") if isinstance(value, dict) else ""
+        return str(value)
+
+    text = LIQUID_URL.sub(lambda m: m.group(2), text)
+    text = LIQUID_SITE.sub(site_value, text)
+    text = KRAMDOWN_ATTRIBUTES.sub("", text)
+    text = re.sub(r"<iframe\b.*?</iframe>", "", text, flags=re.S | re.I)
+    text = HTML_HEADING.sub(lambda m: f"\n\n{'#' * int(m.group(1))} {m.group(2).strip()}\n\n", text)
+    text = HTML_LINK.sub(lambda m: f"[{m.group(2).strip()}]({m.group(1)})", text)
+    text = re.sub(r"</?(?:strong|b)>", "**", text, flags=re.I)
+    text = re.sub(r"</?(?:em|i)>", "*", text, flags=re.I)
+    text = HTML_BLOCK.sub("\n\n", text)
+    return html.unescape(text)
+
+
+def parse_blocks(text: str) -> List[Tuple]:
+    """Block structure of a markdown body:
+    ('h', level, text), ('p', text), ('code', text), ('list', [(depth, ordered, text)]),
+    ('quote', text), ('table', rows), ('image', alt, src), ('hr',)."""
+    lines = text.splitlines()
+    blocks: List[Tuple] = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        if not stripped:
+            i += 1
+            continue
+        if stripped.startswith(("```", "~~~")):
+            fence = stripped[:3]
+            body = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith(fence):
+                body.append(lines[i])
+                i += 1
+            blocks.append(("code", "\n".join(body)))
+            i += 1
+            continue
+        match = HEADING.match(stripped)
+        if match:
+            blocks.append(("h", len(match.group(1)), match.group(2)))
+            i += 1
+            continue
+        if HR.match(stripped):
+            blocks.append(("hr",))
+            i += 1
+            continue
+        match = IMAGE_LINE.match(line) or HTML_IMAGE.fullmatch(stripped)
+        if match:
+            alt, src = (match.group(1), match.group(2)) if match.re is IMAGE_LINE else ("", match.group(1))
+            blocks.append(("image", alt, src))
+            i += 1
+            continue
+        if stripped.lower().startswith(("<table", "<div", "<style")) and "<table" in "".join(lines[i:i + 5]).lower():
+            start = i
+            while i < len(lines) and "</table>" not in lines[i].lower():
+                i += 1
+            parser = _HtmlTable()
+            parser.feed("\n".join(lines[start:i + 1]))
+            i += 1
+            while i < len(lines) and lines[i].strip().lower() in ("</div>", "<br>", "<br/>"):
+                i += 1
+            if parser.rows:
+                blocks.append(("table", [r for r in parser.rows if r]))
+            continue
+        if stripped.startswith("|") and i + 1 < len(lines) and TABLE_DIVIDER.match(lines[i + 1]):
+            rows = [split_row(line)]
+            i += 2
+            while i < len(lines) and lines[i].strip().startswith("|"):
+                rows.append(split_row(lines[i]))
+                i += 1
+            blocks.append(("table", rows))
+            continue
+        if stripped.startswith(">"):
+            quote = []
+            while i < len(lines) and lines[i].strip().startswith(">"):
+                quote.append(lines[i].strip()[1:].strip())
+                i += 1
+            blocks.append(("quote", " ".join(q for q in quote if q) or " "))
+            continue
+        if LIST_ITEM.match(line):
+            items: List[List] = []
+            while i < len(lines):
+                match = LIST_ITEM.match(lines[i])
+                if match:
+                    depth = len(match.group(1).expandtabs(4)) // 2
+                    items.append([min(depth, 3), match.group(2)[0].isdigit(), match.group(3)])
+                elif lines[i].strip() and items and lines[i].startswith((" ", "\t")):
+                    items[-1][2] += " " + lines[i].strip()  # continuation line
+                else:
+                    break
+                i += 1
+            blocks.append(("list", [tuple(item) for item in items]))
+            continue
+        para = [stripped]
+        i += 1
+        while i < len(lines) and lines[i].strip() and not (
+                lines[i].strip().startswith(("```", "~~~", "#", ">", "|", "<table", "<div"))
+                or LIST_ITEM.match(lines[i]) or HR.match(lines[i].strip())):
+            para.append(lines[i].strip())
+            i += 1
+        # Markdown hard breaks (two trailing spaces / backslash) become line breaks
+        blocks.append(("p", "\n".join(para)))
+    return blocks
+
+
+# ============================================================================
+# PDF
+# ============================================================================
+
+def paragraph(markup: str, style: ParagraphStyle) -> Paragraph:
+    try:
+        return Paragraph(markup, style)
+    except ValueError:
+        # Unbalanced markup from odd source text: fall back to plain text
+        return Paragraph(escape(re.sub(r"<[^>]+>", "", markup)), style)
+
+
+def table_flowable(rows: List[List[str]], width: float, styles, fonts: Fonts, site_url: str) -> Table:
+    columns = max(len(r) for r in rows)
+    rows = [r + [""] * (columns - len(r)) for r in rows]
+    data = [[paragraph(inline(cell, fonts, site_url) if r else f"<b>{inline(cell, fonts, site_url)}</b>",
+                       styles["cell"]) for cell in row] for r, row in enumerate(rows)]
+    # Columns sized by their longest cell, within limits
+    longest = [max(min(len(row[c]), 40) for row in rows) + 3 for c in range(columns)]
+    widths = [width * n / sum(longest) for n in longest]
+    table = Table(data, colWidths=widths, repeatRows=1, hAlign="LEFT")
+    table.setStyle(TableStyle([
+        ("GRID", (0, 0), (-1, -1), 0.4, RULE),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e8edf3")),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("TOPPADDING", (0, 0), (-1, -1), 3),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
+    ]))
+    return table
+
+
+def image_flowable(repo_root: Path, src: str, alt: str, width: float, styles, fonts: Fonts, site_url: str):
+    path = src.split("?")[0]
+    if site_url and path.startswith(site_url):
+        path = path[len(site_url):]
+    local = repo_root / path.lstrip("/")
+    if not path.startswith("/") or not local.is_file():
+        label = alt or src
+        return paragraph(f"[image: {escape(clean_text(label, fonts))}]", styles["caption"])
+    w, h = ImageReader(str(local)).getSize()
+    scale = min(1.0, width / w, 4 * inch / h)
+    flowables = [Image(str(local), width=w * scale, height=h * scale, hAlign="CENTER")]
+    if alt:
+        flowables.append(paragraph(escape(clean_text(alt, fonts)), styles["caption"]))
+    return KeepTogether(flowables)
+
+
+def body_flowables(repo_root: Path, blocks: List[Tuple], width: float, styles, fonts: Fonts,
+                   site_url: str) -> List:
+    story: List = []
+    for block in blocks:
+        kind = block[0]
+        if kind == "h":
+            story.append(paragraph(inline(block[2], fonts, site_url), styles[f"h{block[1]}"]))
+        elif kind == "p":
+            markup = inline(block[1], fonts, site_url)
+            markup = re.sub(r"(?: {2,}|\\)\n", "<br/>", markup).replace("\n", " ")
+            story.append(paragraph(markup, styles["body"]))
+        elif kind == "code":
+            story.append(Preformatted(clean_text(block[1], fonts).expandtabs(4), styles["code"],
+                                      maxLineLength=CODE_LINE_CHARS, newLineChars="  "))
+        elif kind == "quote":
+            story.append(paragraph(inline(block[1], fonts, site_url), styles["quote"]))
+        elif kind == "hr":
+            story.append(HRFlowable(width="100%", thickness=0.5, color=RULE, spaceBefore=6, spaceAfter=10))
+        elif kind == "image":
+            story.append(image_flowable(repo_root, block[2], block[1], width, styles, fonts, site_url))
+        elif kind == "table":
+            story.append(table_flowable(block[1], width, styles, fonts, site_url))
+            story.append(Spacer(1, 8))
+        elif kind == "list":
+            story.append(list_flowable(block[1], 0, styles, fonts, site_url))
+    return story
+
+
+def list_flowable(items: List[Tuple[int, bool, str]], depth: int, styles, fonts: Fonts, site_url: str):
+    """Nested ListFlowable from (depth, ordered, text) items."""
+    ordered = items[0][1] if items else False
+    entries = []
+    i = 0
+    while i < len(items):
+        item_depth, _, text = items[i]
+        children = []
+        i += 1
+        while i < len(items) and items[i][0] > item_depth:
+            children.append(items[i])
+            i += 1
+        flow = [paragraph(inline(text, fonts, site_url), ParagraphStyle("li", styles["body"], spaceAfter=2))]
+        if children:
+            flow.append(list_flowable(children, depth + 1, styles, fonts, site_url))
+        entries.append(ListItem(flow))
+    return ListFlowable(entries, bulletType="1" if ordered else "bullet", start=None if ordered else "•",
+                        bulletFontName=styles["body"].fontName, bulletFontSize=9, leftIndent=16,
+                        spaceAfter=6)
+
+
+def render_pdf(repo_root: Path, rel_source: str, rel_pdf: str, meta: Dict) -> Dict:
+    """Worker: render one markdown file to PDF."""
+    started = time.perf_counter()
+    fonts = register_fonts()
+    styles = make_styles(fonts)
+    source = repo_root / rel_source
+    text = source.read_text(encoding="utf-8")
+    body = FRONT_MATTER.sub("", text, count=1)
+    if meta.get("page"):
+        config = yaml.safe_load((repo_root / "_config.yml").read_text(encoding="utf-8")) or {}
+        body = page_markdown(body, config)
+    body = LIQUID.sub("", body)
+    site_url = meta["site_url"]
+
+    out = repo_root / rel_pdf
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(".pdf.tmp")
+    doc = SimpleDocTemplate(str(tmp), pagesize=LETTER, leftMargin=0.9 * inch, rightMargin=0.9 * inch,
+                            topMargin=0.8 * inch, bottomMargin=0.8 * inch,
+                            title=clean_text(meta["title"], fonts), author=meta.get("author", ""),
+                            subject=meta.get("subtitle", ""), creator="PANDAUDIT render_pdfs.py")
+
+    story: List = [paragraph(escape(clean_text(meta["title"], fonts)), styles["title"])]
+    if meta.get("subtitle"):
+        story.append(paragraph(escape(clean_text(meta["subtitle"], fonts)), styles["subtitle"]))
+    details = [escape(d) for d in (meta.get("date"), meta.get("tags")) if d]
+    if meta.get("url"):
+        details.append(f'<link href="{meta["url"]}" color="#2f5f8f">{escape(meta["url"])}</link>')
+    if details:
+        story.append(paragraph("  ·  ".join(details) if fonts.unicode else "  |  ".join(details),
+                               styles["meta"]))
+    story.append(HRFlowable(width="100%", thickness=1, color=ACCENT, spaceBefore=4, spaceAfter=12))
+    story += body_flowables(repo_root, parse_blocks(body), doc.width, styles, fonts, site_url)
+
+    footer = clean_text(f"{meta['title']}  ·  {site_url.replace('https://', '')}", fonts)
+
+    def decorate(canvas, document):
+        canvas.saveState()
+        canvas.setFont(fonts.body, 7.5)
+        canvas.setFillColor(colors.HexColor("#9ca3af"))
+        canvas.drawString(document.leftMargin, 0.5 * inch, footer[:110])
+        canvas.drawRightString(document.leftMargin + document.width, 0.5 * inch, str(document.page))
+        canvas.restoreState()
+
+    doc.build(story, onFirstPage=decorate, onLaterPages=decorate)
+    tmp.replace(out)
+    return {"hash": meta["hash"], "pdf": rel_pdf, "bytes": out.stat().st_size,
+            "pages": doc.page, "seconds": round(time.perf_counter() - started, 3)}
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+def display_date(value) -> str:
+    if isinstance(value, (date, datetime)):
+        return f"{value:%B} {value.day}, {value.year}"
+    return str(value or "")
+
+
+def front_matter_of(path: Path) -> Dict:
+    """Front matter, or its plain `key: value` lines when it isn't valid YAML
+    (some archived posts have unescaped quotes in their titles)."""
+    try:
+        return read_yaml_front_matter(path)
+    except yaml.YAMLError:
+        match = FRONT_MATTER.match(path.read_text(encoding="utf-8"))
+        lines = re.findall(r"^(\w+):\s*(.+?)\s*$", match.group(0) if match else "", re.M)
+        return {key: value.strip("'\"") for key, value in lines}
+
+
+def source_meta(repo_root: Path, rel_source: str, config: Dict) -> Dict:
+    path = repo_root / rel_source
+    front_matter = front_matter_of(path)
+    site_url = str(config.get("url", "")).rstrip("/")
+    tags = front_matter.get("tags") or []
+    if isinstance(tags, str):
+        tags = tags.split()
+    meta = {
+        "title": str(front_matter.get("title") or path.stem),
+        "subtitle": str(front_matter.get("subtitle") or front_matter.get("description") or ""),
+        "author": str(front_matter.get("author") or config.get("author", {}).get("name", "")
+                      if isinstance(config.get("author"), dict) else front_matter.get("author") or ""),
+        "tags": ", ".join(map(str, tags)),
+        "site_url": site_url,
+        "url": "",
+        "date": "",
+    }
+    if POST_FILE_PATTERN.match(path.name):
+        meta["date"] = display_date(front_matter.get("date") or parse_filename(path)[0])
+        # Archived posts aren't built, so they have no page to link to
+        if rel_source.startswith("_posts/"):
+            meta["url"] = expected_url_for_post(path, config)
+    elif rel_source.startswith("_skills/"):
+        meta["tags"] = f"Skill · {front_matter.get('category', '')}".rstrip(" ·")
+        permalink = ((config.get("collections") or {}).get("skills") or {}).get("permalink", "/skills/:name/")
+        meta["url"] = site_url + permalink.replace(":name", slugify(path.stem)).replace(":path", path.stem)
+    elif "/" not in rel_source:
+        meta["page"] = True
+        meta["tags"] = str(front_matter.get("eyebrow") or "")
+        meta["url"] = site_url + page_url(rel_source, front_matter)
+    return meta
+
+
+def pipeline_hash() -> str:
+    """Renderer version: any change to this script re-renders everything."""
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:12]
+
+
+def load_manifest(repo_root: Path) -> Dict[str, Dict]:
+    path = repo_root / MANIFEST
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+
+def sources(repo_root: Path) -> List[Tuple[str, str]]:
+    """(markdown source, PDF path) for every post, skill and root page."""
+    pairs = []
+    for directory, subdir in SOURCES:
+        for path in sorted((repo_root / directory).glob("*.md")):
+            name = slugify(path.stem)
+            pairs.append((f"{directory}/{path.name}", (OUT_DIR / f"{subdir}{name}.pdf").as_posix()))
+    pairs += [(page, pdf) for page, pdf in PAGES if (repo_root / page).is_file()]
+    return pairs
+
+
+def build(repo_root: Path, full: bool, workers: Optional[int],
+          replace_handmade: bool = False) -> Dict[str, Dict]:
+    config = yaml.safe_load((repo_root / "_config.yml").read_text(encoding="utf-8")) or {}
+    previous = load_manifest(repo_root)
+    old = {} if full else previous
+    rendered_before = {entry["pdf"] for entry in previous.values()}
+    renderer = pipeline_hash()
+
+    manifest: Dict[str, Dict] = {}
+    todo: List[Tuple[str, str, Dict]] = []
+    handmade: List[str] = []
+    for rel_source, rel_pdf in sources(repo_root):
+        if (repo_root / rel_pdf).exists() and rel_pdf not in rendered_before and not replace_handmade:
+            handmade.append(rel_pdf)
+            continue
+        digest = hashlib.sha256((repo_root / rel_source).read_bytes()).hexdigest()[:16] + "-" + renderer
+        entry = old.get(rel_source)
+        if entry and entry["hash"] == digest and entry["pdf"] == rel_pdf and (repo_root / rel_pdf).exists():
+            manifest[rel_source] = entry
+        else:
+            meta = source_meta(repo_root, rel_source, config)
+            meta["hash"] = digest
+            todo.append((rel_source, rel_pdf, meta))
+
+    print(f"{len(manifest) + len(todo) + len(handmade)} sources, {len(manifest)} unchanged, "
+          f"{len(todo)} to render" + (f", {len(handmade)} hand-made PDF(s) kept" if handmade else ""))
+    for rel_pdf in handmade:
+        print(f"  kept {rel_pdf} (not rendered by this script; --replace-handmade to replace it)")
+    started = time.perf_counter()
+    failed = 0
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {rel_source: pool.submit(render_pdf, repo_root, rel_source, rel_pdf, meta)
+                       for rel_source, rel_pdf, meta in todo}
+            for rel_source, future in futures.items():
+                try:
+                    manifest[rel_source] = entry = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"  FAILED {rel_source}: {e}")
+                    continue
+                print(f"  {entry['seconds']:6.2f}s {entry['pages']:3d}p {entry['bytes'] / 1024:7.1f} KiB  "
+                      f"{entry['pdf']}")
+        elapsed = time.perf_counter() - started
+        cpu = sum(manifest[s]["seconds"] for s, _, _ in todo if s in manifest)
+        print(f"Rendered {len(todo) - failed} PDF(s) in {elapsed:.1f}s "
+              f"({cpu:.1f}s of render time across workers)" + (f", {failed} failed" if failed else ""))
+
+    # PDFs rendered from sources that were since deleted or renamed; hand-made
+    # PDFs that were never in the manifest are left alone
+    live = {entry["pdf"] for entry in manifest.values()}
+    for source, entry in old.items():
+        if source not in manifest and entry["pdf"] not in live and (repo_root / entry["pdf"]).exists():
+            (repo_root / entry["pdf"]).unlink()
+            print(f"  removed {entry['pdf']}")
+
+    (repo_root / MANIFEST).parent.mkdir(parents=True, exist_ok=True)
+    (repo_root / MANIFEST).write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n",
+                                      encoding="utf-8")
+    return manifest
+
+
+def report(manifest: Dict[str, Dict]) -> None:
+    rows = sorted(manifest.items(), key=lambda item: item[1]["seconds"], reverse=True)
+    print(f"\n{'Source':<70} {'sec':>6} {'pages':>5} {'KiB':>7}")
+    print("-" * 91)
+    for source, entry in rows:
+        print(f"{source[:70]:<70} {entry['seconds']:>6.2f} {entry['pages']:>5} {entry['bytes'] / 1024:>7.1f}")
+    print("-" * 91)
+    print(f"{len(rows)} PDFs, {sum(e['seconds'] for e in manifest.values()):.1f}s total render time, "
+          f"{sum(e['bytes'] for e in manifest.values()) / 2**20:.1f} MiB")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--full", action="store_true", help="re-render every source")
+    parser.add_argument("--report", action="store_true", help="only report, don't render")
+    parser.add_argument("--replace-handmade", action="store_true",
+                        help="render over existing PDFs this script didn't create")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    repo_root = Path(__file__).resolve().parent
+    if args.report:
+        manifest = load_manifest(repo_root)
+    else:
+        manifest = build(repo_root, args.full, args.workers, args.replace_handmade)
+    if not manifest:
+        print("No manifest yet — run without --report first.")
+        return 1
+    report(manifest)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+"""The scripts under test live at the repo root and in discord_bot/, not in a package."""
+
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT, ROOT / "discord_bot"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
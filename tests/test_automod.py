@@ -0,0 +1,41 @@
+"""discord_bot/automod.py: repeated spam is caught, ordinary chatter isn't."""
+
+from automod import AutoMod
+
+
+def kinds(automod, messages, user_id=1, gap=4.0):
+    """Feed messages a few seconds apart (well under the flood rate)."""
+    return [v.kind if v else None
+            for i, text in enumerate(messages)
+            for v in [automod.check(user_id, text, 0, 100.0 + i * gap)]]
+
+
+def test_short_repeated_replies_are_not_duplicates():
+    automod = AutoMod()
+    for reply in ("lol", "ok", "thanks!", "+1", "same here"):
+        assert kinds(automod, [reply] * 4, user_id=hash(reply)) == [None] * 4
+
+
+def test_messages_differing_only_in_numbers_are_not_duplicates():
+    automod = AutoMod()
+    assert kinds(automod, ["row 12 fails", "row 13 fails", "row 14 fails"]) == [None] * 3
+
+
+def test_repeated_spam_is_a_duplicate():
+    automod = AutoMod()
+    spam = ["BUY CHEAP GOLD 4 U!!!", "buy cheap gold 4 u", "Buy  cheap gold 4 U?"]
+    assert kinds(automod, spam) == [None, None, "duplicate"]
+
+
+def test_flood_still_caught():
+    automod = AutoMod()
+    assert kinds(automod, ["ok"] * 6, gap=0.5)[-1] == "flood"
+
+
+def test_flood_trips_on_the_rate_th_message_in_the_window():
+    # rate=(6, 5.0): five messages within 5s pass, the sixth is a flood
+    automod = AutoMod(rate=(6, 5.0))
+    assert kinds(automod, ["ok"] * 6, gap=1.0) == [None] * 5 + ["flood"]
+    # Six spread just over the window never are
+    automod = AutoMod(rate=(6, 5.0))
+    assert kinds(automod, ["ok"] * 6, gap=1.01) == [None] * 6
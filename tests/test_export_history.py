@@ -0,0 +1,47 @@
+"""discord_bot/export_history.py against its local REST stand-in."""
+
+import argparse
+import asyncio
+
+import aiohttp
+import pytest
+
+import export_history
+from export_history import _SyntheticChannel, _benchmark, _standin
+
+
+def test_export_resume_and_skip_forbidden(capsys):
+    # Small run of the embedded benchmark: it asserts row counts, unique ids,
+    # cursors, resume and incremental export, with a 403 channel and two
+    # channels sharing a name
+    _benchmark(messages=20_000, channel_count=5)
+    out = capsys.readouterr().out
+    assert "Checks passed" in out
+    assert "#chan-3: skipped (403" in out
+
+
+@pytest.mark.parametrize("error", [asyncio.TimeoutError(), aiohttp.ClientConnectionError("reset")])
+def test_network_error_skips_only_that_channel(monkeypatch, tmp_path, capsys, error):
+    channels = {"901": ("steady", _SyntheticChannel(1, 500)), "902": ("flaky", _SyntheticChannel(2, 500))}
+    export_channel = export_history.export_channel
+
+    async def flaky(api, channel, *args):
+        if channel["name"] == "flaky":
+            raise error
+        return await export_channel(api, channel, *args)
+
+    monkeypatch.setattr(export_history, "export_channel", flaky)
+
+    async def scenario():
+        runner, api_url = await _standin(channels, set())
+        try:
+            args = argparse.Namespace(out=str(tmp_path), channels=["steady", "flaky"], concurrency=2,
+                                      content=False, guild="1", api=api_url, token="test")
+            return await export_history.run(args)
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(scenario()) == 0
+    out = capsys.readouterr().out
+    assert f"#flaky: skipped ({error!r})" in out
+    assert "Exported 500 message(s) from 1 channel(s)" in out
@@ -0,0 +1,98 @@
+"""discord_bot/feed.py against a local fixture feed served over HTTP."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+
+from aiohttp import web
+
+from feed import FeedPoller
+
+
+def rss(items):
+    body = "".join(
+        f"<item><title>Post {n}</title><link>https://pandaudit.com/post-{n}/</link>"
+        f"<guid>https://pandaudit.com/post-{n}/</guid><description>About {n}</description>"
+        f"<pubDate>Mon, 0{n % 9 + 1} Mar 2026 00:00:00 +0000</pubDate></item>"
+        for n in items
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>PANDAUDIT</title>{body}</channel></rss>'
+
+
+class FixtureFeed:
+    """feed.xml with newest posts first, an ETag, and 304s for matching If-None-Match."""
+
+    def __init__(self):
+        self.items = []
+        self.statuses = []
+
+    async def handle(self, request):
+        body = rss(sorted(self.items, reverse=True)).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            self.statuses.append(304)
+            return web.Response(status=304, headers={"ETag": etag})
+        self.statuses.append(200)
+        return web.Response(body=body, content_type="application/rss+xml", headers={"ETag": etag})
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get("/feed.xml", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}/feed.xml"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+
+def test_announces_only_new_posts():
+    async def scenario():
+        async with FixtureFeed() as feed:
+            feed.items = [1, 2, 3]
+            poller = FeedPoller(feed.url, cache_size=5)
+            try:
+                # First poll only primes the cache, so a restart announces nothing
+                assert await poller.poll() == []
+                assert poller.latest.title == "Post 3"
+
+                # Unchanged feed: a 304 and nothing new
+                assert await poller.poll() == []
+                assert feed.statuses == [200, 304]
+
+                feed.items += [4, 5]
+                fresh = await poller.poll()
+                assert [e.title for e in fresh] == ["Post 4", "Post 5"]   # oldest first
+                assert fresh[0].link == "https://pandaudit.com/post-4/"
+                assert poller.latest.title == "Post 5"
+
+                # Cache stays bounded, newest first
+                feed.items += [6, 7, 8]
+                assert [e.title for e in await poller.poll()] == ["Post 6", "Post 7", "Post 8"]
+                assert [e.title for e in poller.entries.values()] == [f"Post {n}" for n in (8, 7, 6, 5, 4)]
+            finally:
+                await poller.close()
+
+    asyncio.run(scenario())
+
+
+def test_republished_feed_does_not_repeat_posts():
+    async def scenario():
+        async with FixtureFeed() as feed:
+            feed.items = [1, 2]
+            poller = FeedPoller(feed.url)
+            try:
+                await poller.poll()
+                # A rebuild that changes the ETag but adds no posts announces nothing
+                feed.items = [1, 2]
+                poller.etag = None
+                assert await poller.poll() == []
+            finally:
+                await poller.close()
+
+    asyncio.run(scenario())
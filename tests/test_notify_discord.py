@@ -0,0 +1,117 @@
+"""notify_discord.py against a local stand-in for the Discord webhook."""
+
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+import pytest
+
+import notify_discord
+
+
+class WebhookStandIn:
+    """Records each request; answers with the scripted responses, then 204."""
+
+    def __init__(self, responses=()):
+        self.requests = []
+        self.responses = list(responses)
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                stand_in.requests.append({"path": self.path, "json": json.loads(body)})
+                status, payload = stand_in.responses.pop(0) if stand_in.responses else (204, None)
+                data = json.dumps(payload).encode() if payload is not None else b""
+                self.send_response(status)
+                if data:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/api/webhooks/1/token"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def make_posts(tmp_path):
+    def make(count):
+        posts_dir = tmp_path / "_posts"
+        posts_dir.mkdir(exist_ok=True)
+        posts = []
+        for i in range(count):
+            post = posts_dir / f"2026-03-{i + 1:02d}-post-number-{i}.md"
+            post.write_text(f"---\ntitle: Post {i}\nsubtitle: About {i}\n---\nBody\n", encoding="utf-8")
+            posts.append(post)
+        return posts
+    return make
+
+
+CONFIG = {"url": "https://pandaudit.com", "permalink": "/:year-:month-:day-:title/"}
+
+
+def test_payload(make_posts, tmp_path):
+    webhook = WebhookStandIn()
+    try:
+        sent = notify_discord.announce(make_posts(1), CONFIG, webhook.url, tmp_path / "ledger.json")
+    finally:
+        webhook.close()
+
+    assert sent == 1
+    [request] = webhook.requests
+    assert request["path"].endswith("?wait=true")
+    [embed] = request["json"]["embeds"]
+    assert embed["title"] == "New Blog Post: Post 0"
+    assert embed["description"] == "About 0"
+    assert embed["url"] == "https://pandaudit.com/2026-03-01-post-number-0/"
+
+
+def test_batches_and_ledger(make_posts, tmp_path):
+    posts = make_posts(23)
+    ledger = tmp_path / "ledger.json"
+    webhook = WebhookStandIn()
+    try:
+        notify_discord.announce(posts, CONFIG, webhook.url, ledger)
+        # A rerun of the same range announces nothing
+        assert notify_discord.announce(posts, CONFIG, webhook.url, ledger) == 0
+    finally:
+        webhook.close()
+
+    assert [len(r["json"]["embeds"]) for r in webhook.requests] == [10, 10, 3]
+    urls = [e["url"] for r in webhook.requests for e in r["json"]["embeds"]]
+    assert len(set(urls)) == 23
+    assert set(json.loads(ledger.read_text())) == set(urls)
+
+
+def test_retries_after_429(make_posts, tmp_path):
+    webhook = WebhookStandIn([(429, {"message": "You are being rate limited.", "retry_after": 0.05})])
+    try:
+        sent = notify_discord.announce(make_posts(2), CONFIG, webhook.url, tmp_path / "ledger.json")
+    finally:
+        webhook.close()
+
+    assert sent == 2
+    assert len(webhook.requests) == 2
+    assert webhook.requests[0]["json"] == webhook.requests[1]["json"]
+
+
+def test_gives_up_when_still_limited():
+    limited = (429, {"retry_after": 0.01})
+    webhook = WebhookStandIn([limited] * 3)
+    try:
+        with pytest.raises(RuntimeError):
+            notify_discord.post_webhook(notify_discord.requests.Session(), webhook.url, [{}], max_attempts=3)
+    finally:
+        webhook.close()
+    assert len(webhook.requests) == 3
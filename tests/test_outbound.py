@@ -0,0 +1,57 @@
+"""discord_bot/outbound.py: failures are logged once, replies are counted."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import pytest
+
+from outbound import OutboundScheduler, Priority
+
+
+async def fail():
+    raise RuntimeError("403 Forbidden")
+
+
+async def ok():
+    return "sent"
+
+
+def test_awaited_failure_is_left_to_the_caller(caplog):
+    async def scenario():
+        outbound = OutboundScheduler({})
+        with pytest.raises(RuntimeError):
+            await outbound.submit(Priority.REPLY, "channel:1", fail)
+        await outbound.close()
+
+    with caplog.at_level(logging.WARNING, logger="pandaudit_bot"):
+        asyncio.run(scenario())
+    assert "Outbound action failed" not in caplog.text
+
+
+def test_posted_failure_is_logged(caplog):
+    async def scenario():
+        outbound = OutboundScheduler({})
+        outbound.post(Priority.COSMETIC, "reactions:1", fail)
+        await asyncio.sleep(0.05)
+        await outbound.close()
+
+    with caplog.at_level(logging.WARNING, logger="pandaudit_bot"):
+        asyncio.run(scenario())
+    assert caplog.text.count("Outbound action failed: 403 Forbidden") == 1
+
+
+def test_replies_share_the_channel_budget_and_are_counted():
+    async def scenario():
+        outbound = OutboundScheduler({"channel": (2, 60.0)})
+        replies = [outbound.submit(Priority.REPLY, "channel:1", ok) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        stats = outbound.snapshot()["reply"]
+        await outbound.close()
+        return [r.result() for r in replies], stats
+
+    results, stats = asyncio.run(scenario())
+    # Two fit the channel budget; the third was still queued at close
+    assert results == ["sent", "sent", None]
+    assert stats["submitted"] == 3 and stats["sent"] == 2 and stats["depth"] == 1
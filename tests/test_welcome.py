@@ -0,0 +1,32 @@
+"""discord_bot/welcome.py: raid mode ends with the burst."""
+
+from __future__ import annotations
+
+import asyncio
+
+from welcome import WelcomeBatcher, _FakeGuild, _FakeMember
+
+
+def test_lone_join_after_raid_gets_normal_welcome():
+    async def scenario():
+        guild = _FakeGuild([0])
+        sent = []
+        batcher = WelcomeBatcher(lambda members, raid: (len(members), raid), ["welcome"],
+                                 batch_seconds=0.01, max_batch_seconds=0.05,
+                                 raid_joins=5, raid_window=0.2,
+                                 send=lambda channel, embed: asyncio.sleep(0, sent.append(embed)))
+        for i in range(10):
+            batcher.add(_FakeMember(guild, i))
+        while batcher.tasks:
+            await asyncio.sleep(0.01)
+        assert sent and all(raid for _, raid in sent)
+        assert not batcher.raiding.get(guild.id)
+
+        sent.clear()
+        await asyncio.sleep(0.25)          # the burst has left the raid window
+        batcher.add(_FakeMember(guild, 99))
+        while batcher.tasks:
+            await asyncio.sleep(0.01)
+        assert sent == [(1, False)]
+
+    asyncio.run(scenario())